@@ -11,6 +11,59 @@ class Settings(BaseSettings):
     ACCESS_TOKEN_EXPIRE_MINUTES: int = 30
     MEDIA_URL: str = os.getenv("MEDIA_URL", "http://localhost:8000")
 
+    # Response cache for the public read endpoints ("memory" or "redis")
+    CACHE_BACKEND: str = os.getenv("CACHE_BACKEND", "memory")
+    CACHE_TTL_SECONDS: int = int(os.getenv("CACHE_TTL_SECONDS", "60"))
+    CACHE_MAX_ENTRIES: int = int(os.getenv("CACHE_MAX_ENTRIES", "512"))
+    REDIS_URL: str = os.getenv("REDIS_URL", "redis://localhost:6379/0")
+
+    # bcrypt runs on a dedicated pool; jobs beyond the queue limit get a 503
+    PASSWORD_HASH_WORKERS: int = int(os.getenv("PASSWORD_HASH_WORKERS", "2"))
+    PASSWORD_HASH_MAX_QUEUE: int = int(os.getenv("PASSWORD_HASH_MAX_QUEUE", "32"))
+
+    # Short-lived cache of authenticated users, keyed by token
+    PRINCIPAL_CACHE_TTL_SECONDS: int = int(os.getenv("PRINCIPAL_CACHE_TTL_SECONDS", "30"))
+    PRINCIPAL_CACHE_MAX_ENTRIES: int = int(os.getenv("PRINCIPAL_CACHE_MAX_ENTRIES", "1024"))
+
+    # Per-kind upload size limits, in bytes
+    MAX_IMAGE_UPLOAD_BYTES: int = int(os.getenv("MAX_IMAGE_UPLOAD_BYTES", str(10 * 1024 * 1024)))
+    MAX_VIDEO_UPLOAD_BYTES: int = int(os.getenv("MAX_VIDEO_UPLOAD_BYTES", str(500 * 1024 * 1024)))
+    MAX_DOCUMENT_UPLOAD_BYTES: int = int(os.getenv("MAX_DOCUMENT_UPLOAD_BYTES", str(50 * 1024 * 1024)))
+    MAX_IMPORT_UPLOAD_BYTES: int = int(os.getenv("MAX_IMPORT_UPLOAD_BYTES", str(200 * 1024 * 1024)))
+
+    # Unreferenced media blobs are deleted after the grace period
+    MEDIA_GC_INTERVAL_SECONDS: int = int(os.getenv("MEDIA_GC_INTERVAL_SECONDS", "3600"))
+    MEDIA_GC_GRACE_SECONDS: int = int(os.getenv("MEDIA_GC_GRACE_SECONDS", "3600"))
+
+    # Threads resizing gallery images into responsive variants
+    IMAGE_VARIANT_WORKERS: int = int(os.getenv("IMAGE_VARIANT_WORKERS", "2"))
+
+    # How often each worker checks its typeahead indexes against other workers' writes
+    TYPEAHEAD_REFRESH_SECONDS: int = int(os.getenv("TYPEAHEAD_REFRESH_SECONDS", "30"))
+
+    # MongoDB connection pool; a request waiting longer than the wait queue timeout for
+    # a connection fails fast instead of piling up behind a degraded cluster
+    MONGO_MAX_POOL_SIZE: int = int(os.getenv("MONGO_MAX_POOL_SIZE", "50"))
+    MONGO_MIN_POOL_SIZE: int = int(os.getenv("MONGO_MIN_POOL_SIZE", "5"))
+    MONGO_MAX_IDLE_TIME_MS: int = int(os.getenv("MONGO_MAX_IDLE_TIME_MS", "300000"))
+    MONGO_WAIT_QUEUE_TIMEOUT_MS: int = int(os.getenv("MONGO_WAIT_QUEUE_TIMEOUT_MS", "2000"))
+    MONGO_SERVER_SELECTION_TIMEOUT_MS: int = int(os.getenv("MONGO_SERVER_SELECTION_TIMEOUT_MS", "3000"))
+    MONGO_CONNECT_TIMEOUT_MS: int = int(os.getenv("MONGO_CONNECT_TIMEOUT_MS", "3000"))
+    MONGO_SOCKET_TIMEOUT_MS: int = int(os.getenv("MONGO_SOCKET_TIMEOUT_MS", "10000"))
+
+    # Circuit breaker around the database: after this many connection failures in a row
+    # requests get an immediate 503 (or stale cached content) while reconnects back off
+    DB_BREAKER_FAILURE_THRESHOLD: int = int(os.getenv("DB_BREAKER_FAILURE_THRESHOLD", "3"))
+    DB_BREAKER_BASE_BACKOFF_SECONDS: float = float(os.getenv("DB_BREAKER_BASE_BACKOFF_SECONDS", "1"))
+    DB_BREAKER_MAX_BACKOFF_SECONDS: float = float(os.getenv("DB_BREAKER_MAX_BACKOFF_SECONDS", "60"))
+    SERVE_STALE_ON_DB_OUTAGE: bool = os.getenv("SERVE_STALE_ON_DB_OUTAGE", "true").lower() == "true"
+
+    # Commands slower than this are logged to the capped slow_queries collection;
+    # this share of slow finds/aggregates is also explained to catch collection scans
+    SLOW_QUERY_MS: int = int(os.getenv("SLOW_QUERY_MS", "200"))
+    SLOW_QUERY_EXPLAIN_SAMPLE_RATE: float = float(os.getenv("SLOW_QUERY_EXPLAIN_SAMPLE_RATE", "0.1"))
+    SLOW_QUERY_LOG_BYTES: int = int(os.getenv("SLOW_QUERY_LOG_BYTES", str(16 * 1024 * 1024)))
+
     class Config:
         env_file = ".env"
 
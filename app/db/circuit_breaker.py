@@ -0,0 +1,64 @@
+import time
+
+CLOSED = "closed"
+OPEN = "open"
+HALF_OPEN = "half_open"
+
+class CircuitBreaker:
+    """Stop calling a dependency that keeps failing, then probe it with backoff.
+
+    Closed: calls go through and failures are counted. Once ``threshold``
+    failures happen in a row (or any failure marked ``trip``) the circuit
+    opens and calls are refused until the backoff elapses. Then one call
+    is let through as a probe (half-open): success closes the circuit,
+    failure reopens it with double the backoff, up to ``max_backoff``. A
+    probe that never reports back is replaced after another backoff.
+    """
+
+    def __init__(self, threshold: int = 3, base_backoff: float = 1.0, max_backoff: float = 60.0):
+        self.threshold = threshold
+        self.base_backoff = base_backoff
+        self.max_backoff = max_backoff
+        self.state = CLOSED
+        self.failures = 0
+        self.backoff = base_backoff
+        self.retry_at = 0.0
+
+    def allow_request(self) -> bool:
+        if self.state == CLOSED:
+            return True
+        now = time.monotonic()
+        if now < self.retry_at:
+            return False
+        # Let this call probe the dependency; everyone else waits for its result
+        self.state = HALF_OPEN
+        self.retry_at = now + self.backoff
+        return True
+
+    def record_success(self):
+        self.state = CLOSED
+        self.failures = 0
+        self.backoff = self.base_backoff
+
+    def record_failure(self, trip: bool = False):
+        if self.state == OPEN:
+            # Calls that were already in flight when the circuit opened
+            return
+        if self.state == HALF_OPEN:
+            self.backoff = min(self.backoff * 2, self.max_backoff)
+            self._open()
+            return
+        self.failures += 1
+        if trip or self.failures >= self.threshold:
+            self._open()
+
+    def _open(self):
+        self.state = OPEN
+        self.retry_at = time.monotonic() + self.backoff
+
+    def retry_after(self) -> int:
+        """Whole seconds until the next probe is allowed"""
+        return max(1, int(self.retry_at - time.monotonic() + 0.999))
+
+    def stats(self) -> dict:
+        return {"state": self.state, "failures": self.failures, "retry_after": self.retry_after() if self.state != CLOSED else 0}
@@ -1,58 +1,148 @@
-from pymongo import MongoClient
-from pymongo.errors import ConnectionFailure
+from fastapi import HTTPException
+from pymongo import AsyncMongoClient, monitoring
+from pymongo.asynchronous.database import AsyncDatabase
 from app.config import settings
-import ssl
+from app.db.circuit_breaker import CLOSED, OPEN, CircuitBreaker
+from app.services.metrics import mongo_command_metrics, mongo_pool_metrics, pool_stats
+from app.services.slow_queries import slow_query_listener
+from typing import Optional
+import asyncio
 import os
 
-# Initialize db as None
-db = None
+# Initialize db as None. To run against a local mongod, set MONGODB_URL;
+# for an in-process stand-in, assign its async database to ``db`` before
+# startup and get_database() will serve it without connecting.
+client: Optional[AsyncMongoClient] = None
+db: Optional[AsyncDatabase] = None
+_connect_lock = asyncio.Lock()
 
-def initialize_database():
-    global db
+# Trips on failed connects and on connection errors surfacing from requests,
+# so an outage costs requests milliseconds instead of a timeout each
+database_breaker = CircuitBreaker(
+    threshold=settings.DB_BREAKER_FAILURE_THRESHOLD,
+    base_backoff=settings.DB_BREAKER_BASE_BACKOFF_SECONDS,
+    max_backoff=settings.DB_BREAKER_MAX_BACKOFF_SECONDS,
+)
+
+class DatabaseUnavailable(HTTPException):
+    def __init__(self):
+        super().__init__(
+            status_code=503,
+            detail="Database temporarily unavailable",
+            headers={"Retry-After": str(database_breaker.retry_after())},
+        )
+
+class BreakerListener(monitoring.CommandListener):
+    """Close the circuit as soon as a command gets through again"""
+
+    def started(self, event):
+        pass
+
+    def succeeded(self, event):
+        if database_breaker.state != CLOSED or database_breaker.failures:
+            database_breaker.record_success()
+
+    def failed(self, event):
+        pass
+
+breaker_listener = BreakerListener()
+
+def client_options() -> dict:
+    """Pool sizing and timeouts shared by every connection attempt"""
+    return {
+        "maxPoolSize": settings.MONGO_MAX_POOL_SIZE,
+        "minPoolSize": settings.MONGO_MIN_POOL_SIZE,
+        "maxIdleTimeMS": settings.MONGO_MAX_IDLE_TIME_MS,
+        "waitQueueTimeoutMS": settings.MONGO_WAIT_QUEUE_TIMEOUT_MS,
+        "serverSelectionTimeoutMS": settings.MONGO_SERVER_SELECTION_TIMEOUT_MS,
+        "connectTimeoutMS": settings.MONGO_CONNECT_TIMEOUT_MS,
+        "socketTimeoutMS": settings.MONGO_SOCKET_TIMEOUT_MS,
+        "event_listeners": [mongo_command_metrics, mongo_pool_metrics, slow_query_listener, breaker_listener],
+    }
+
+async def _connect(url: str, **extra) -> AsyncMongoClient:
+    """Open a client and ping it, closing it again if the ping fails"""
+    new_client = AsyncMongoClient(url, **client_options(), **extra)
+    try:
+        await new_client.admin.command('ping')
+    except BaseException:
+        # Also on cancellation, e.g. shutdown during a startup connect
+        await new_client.close()
+        raise
+    return new_client
+
+async def prewarm_pool(mongo_client: AsyncMongoClient):
+    """Open minPoolSize connections now rather than on the first requests"""
+    count = settings.MONGO_MIN_POOL_SIZE
+    if count <= 0:
+        return
+    # Concurrent pings each need their own connection
+    results = await asyncio.gather(*(mongo_client.admin.command('ping') for _ in range(count)), return_exceptions=True)
+    failures = [r for r in results if isinstance(r, Exception)]
+    if failures:
+        print(f"Pool prewarm: {len(failures)} of {count} connections failed: {failures[0]}")
+
+async def initialize_database() -> Optional[AsyncDatabase]:
+    global client, db
+    # Get MongoDB URL from environment
+    mongodb_url = os.getenv('MONGODB_URL', settings.MONGODB_URL)
     try:
-        # Get MongoDB URL from environment
-        mongodb_url = os.getenv('MONGODB_URL', settings.MONGODB_URL)
         print(f"Attempting to connect to MongoDB...")
-        
         # Try connection without explicit SSL parameters first
-        client = MongoClient(
-            mongodb_url,
-            serverSelectionTimeoutMS=10000,
-            connectTimeoutMS=10000,
-            socketTimeoutMS=10000
-        )
-        
-        # Test the connection
-        client.admin.command('ping')
-        db = client.jnani_tuition
+        client = await _connect(mongodb_url)
         print("Connected to MongoDB successfully!")
-        return db
-        
     except Exception as e:
         print(f"Failed to connect to MongoDB: {e}")
         # Try alternative connection method
         try:
             # Remove SSL parameters from URL and add them explicitly
             base_url = mongodb_url.split('?')[0]
-            client = MongoClient(
-                base_url,
-                ssl=True,
-                ssl_cert_reqs=ssl.CERT_NONE,
-                serverSelectionTimeoutMS=10000,
-                connectTimeoutMS=10000,
-                socketTimeoutMS=10000
-            )
-            client.admin.command('ping')
-            db = client.jnani_tuition
+            client = await _connect(base_url, tls=True, tlsAllowInvalidCertificates=True)
             print("Connected to MongoDB with SSL fallback!")
-            return db
         except Exception as e2:
             print(f"SSL fallback also failed: {e2}")
+            client = None
             db = None
             return None
 
-def get_database():
+    db = client.jnani_tuition
+    await prewarm_pool(client)
+    return db
+
+async def get_database() -> AsyncDatabase:
+    """The connected database, or a fast 503 while the circuit is open"""
     global db
+    if not database_breaker.allow_request():
+        raise DatabaseUnavailable()
     if db is None:
-        db = initialize_database()
-    return db 
\ No newline at end of file
+        async with _connect_lock:
+            # A connect that failed while we queued has opened the circuit; don't repeat it
+            if db is None and database_breaker.state == OPEN:
+                raise DatabaseUnavailable()
+            if db is None:
+                await initialize_database()
+                if db is None:
+                    database_breaker.record_failure(trip=True)
+        if db is None:
+            raise DatabaseUnavailable()
+    return db
+
+def is_connected() -> bool:
+    return db is not None
+
+async def close_database():
+    """Close the client and every pooled connection"""
+    global client, db
+    if client is not None:
+        await client.close()
+        print("Closed MongoDB connection")
+    client = None
+    db = None
+
+def database_pool_stats() -> dict:
+    """Current pool usage next to its configured limits"""
+    return {
+        **pool_stats(),
+        "max_pool_size": settings.MONGO_MAX_POOL_SIZE,
+        "min_pool_size": settings.MONGO_MIN_POOL_SIZE,
+    }
@@ -0,0 +1,106 @@
+from pymongo import ASCENDING, DESCENDING, TEXT, IndexModel
+from pymongo.asynchronous.database import AsyncDatabase
+from pymongo.errors import OperationFailure
+from typing import Dict, List
+
+# Indexes every collection is expected to have, by collection name.
+# Names are explicit so drift can be detected by comparing definitions.
+# Mongo allows one text index per collection; it backs ?q= search.
+INDEXES: Dict[str, List[IndexModel]] = {
+    "users": [
+        IndexModel([("email", ASCENDING)], name="email_unique", unique=True),
+    ],
+    "roles": [
+        IndexModel([("name", ASCENDING)], name="name"),
+    ],
+    "content": [
+        IndexModel([("type", ASCENDING)], name="type"),
+    ],
+    "images": [
+        IndexModel([("album_id", ASCENDING), ("created_at", ASCENDING)], name="album_id_created_at"),
+    ],
+    "contact_enquiries": [
+        # _id breaks created_at ties, matching the listing and export sort
+        IndexModel([("created_at", DESCENDING), ("_id", DESCENDING)], name="created_at_id_desc"),
+        IndexModel([("status", ASCENDING), ("created_at", DESCENDING), ("_id", DESCENDING)], name="status_created_at_id"),
+        IndexModel(
+            [("name", TEXT), ("email", TEXT), ("message", TEXT)],
+            name="search_text", weights={"name": 5, "email": 5, "message": 1}
+        ),
+    ],
+    "events": [
+        IndexModel([("event_date", DESCENDING)], name="event_date_desc"),
+        # Carousel and events section: active events ordered by date
+        IndexModel([("is_active", ASCENDING), ("event_date", DESCENDING)], name="is_active_event_date"),
+        IndexModel([("title", TEXT), ("description", TEXT)], name="search_text", weights={"title": 5, "description": 1}),
+    ],
+    "library": [
+        IndexModel([("title", TEXT), ("description", TEXT)], name="search_text", weights={"title": 5, "description": 1}),
+    ],
+    "courses": [
+        IndexModel([("name", TEXT), ("subjects", TEXT)], name="search_text", weights={"name": 5, "subjects": 3}),
+    ],
+    "media_blobs": [
+        IndexModel([("refcount", ASCENDING), ("updated_at", ASCENDING)], name="refcount_updated_at"),
+    ],
+}
+
+def _index_options(document: dict) -> dict:
+    """Reduce an index spec to the parts that define its behaviour"""
+    keys = document["key"]
+    if hasattr(keys, "items"):
+        keys = keys.items()
+    keys = [(field, direction) for field, direction in keys]
+    if any(direction == TEXT for _, direction in keys):
+        # Mongo reports text indexes as _fts/_ftsx keys; the fields live in the weights
+        weights = {field: 1 for field, direction in keys if direction == TEXT and field != "_fts"}
+        weights.update(document.get("weights") or {})
+        return {"text": sorted(weights.items()), "unique": bool(document.get("unique", False))}
+    return {
+        "key": keys,
+        "unique": bool(document.get("unique", False)),
+    }
+
+async def ensure_indexes(db: AsyncDatabase) -> Dict[str, dict]:
+    """Create any missing declared index and report drift.
+
+    Creation is idempotent: indexes that already exist with the same
+    definition are left alone. Existing indexes whose definition differs
+    from the declaration, and undeclared indexes, are reported but never
+    dropped automatically.
+    """
+    report = {}
+    for collection_name, models in INDEXES.items():
+        collection = db[collection_name]
+        existing = await collection.index_information()
+        missing, mismatched = [], []
+
+        for model in models:
+            declared = model.document
+            current = existing.get(declared["name"])
+            if current is None:
+                missing.append(model)
+            elif _index_options(current) != _index_options(declared):
+                mismatched.append(declared["name"])
+
+        declared_names = {model.document["name"] for model in models}
+        unexpected = [name for name in existing if name != "_id_" and name not in declared_names]
+
+        failed = []
+        for model in missing:
+            try:
+                await collection.create_indexes([model])
+            except OperationFailure as e:
+                failed.append(model.document["name"])
+                print(f"Failed to create index {collection_name}.{model.document['name']}: {e}")
+
+        report[collection_name] = {
+            "created": [m.document["name"] for m in missing if m.document["name"] not in failed],
+            "failed": failed,
+            "mismatched": mismatched,
+            "unexpected": unexpected,
+        }
+        if mismatched or unexpected:
+            print(f"Index drift on {collection_name}: mismatched={mismatched} unexpected={unexpected}")
+
+    return report
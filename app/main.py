@@ -1,33 +1,120 @@
-from fastapi import FastAPI, HTTPException
+from fastapi import FastAPI, Request, Response
+from fastapi.responses import JSONResponse
 from fastapi.middleware.cors import CORSMiddleware
-from fastapi.staticfiles import StaticFiles
 from app.routes import auth, students, courses, faculty, users, roles, permissions, events, library, classes, gallery
 from app.routes import content as content_routes
+from app.routes import search as search_routes
+from app.routes import public as public_routes
+from app.routes import slow_queries as slow_query_routes
 from app.routes import contact_enquiry as contact_enquiry_routes
-from app.db.database import get_database
+from app.db.circuit_breaker import CLOSED
+from app.db.database import (
+    DatabaseUnavailable,
+    close_database,
+    database_breaker,
+    database_pool_stats,
+    get_database,
+    is_connected,
+)
+from app.db.indexes import ensure_indexes
 from app.services.user_service import create_default_admin
+from app.services.auth import password_hash_executor
+from app.services.uploads import UploadLimitMiddleware
+from app.services.media_store import run_garbage_collector
+from app.services.media_files import MediaFiles
+from app.services.image_variants import image_variant_executor, backfill_image_variants
+from app.services.typeahead import run_typeahead_refresher
+from app.services.slow_queries import ensure_slow_query_log
+from app.services.cache import stale_response
+from app.config import settings
+from pymongo.errors import ConnectionFailure
+from app.services.metrics import CONTENT_TYPE as METRICS_CONTENT_TYPE, MetricsMiddleware, register_runtime_gauges, render_metrics
+from contextlib import asynccontextmanager
+import asyncio
 import os
 
+BACKGROUND_TASKS = ("bootstrap_task", "media_gc_task", "image_variant_backfill", "typeahead_refresher")
+
+async def bootstrap(app: FastAPI):
+    """Connect to Mongo and prepare it, retrying until it is reachable.
+
+    Runs in the background so the process serves /health straight away;
+    /ready turns 200 once this has finished. Retries follow the circuit
+    breaker's backoff.
+    """
+    while True:
+        try:
+            db = await get_database()
+            break
+        except DatabaseUnavailable:
+            delay = database_breaker.retry_after()
+            print(f"Database unavailable, retrying in {delay}s")
+            await asyncio.sleep(delay)
+
+    for step in (ensure_slow_query_log, ensure_indexes, create_default_admin):
+        try:
+            await step(db)
+        except Exception as e:
+            # Another instance may be bootstrapping the same database
+            print(f"Startup step {step.__name__} failed: {e}")
+
+    app.state.media_gc_task = asyncio.create_task(run_garbage_collector(db))
+    app.state.image_variant_backfill = asyncio.create_task(backfill_image_variants(db))
+    app.state.typeahead_refresher = asyncio.create_task(run_typeahead_refresher(db))
+    app.state.ready = True
+    print("Startup complete, ready to serve")
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    app.state.ready = False
+    app.state.bootstrap_task = asyncio.create_task(bootstrap(app))
+
+    yield
+
+    tasks = [getattr(app.state, name, None) for name in BACKGROUND_TASKS]
+    tasks = [task for task in tasks if task is not None]
+    for task in tasks:
+        task.cancel()
+    # Let cancelled tasks unwind before their client goes away
+    await asyncio.gather(*tasks, return_exceptions=True)
+    await close_database()
+    password_hash_executor.shutdown(wait=False)
+    image_variant_executor.shutdown(wait=False)
+
 app = FastAPI(
     title="Jnani Tuition Classes API",
     description="Backend API for Jnani Tuition Classes website and admin panel",
-    version="1.0.0"
+    version="1.0.0",
+    lifespan=lifespan
 )
 
-@app.on_event("startup")
-def on_startup():
-    db = get_database()
-    if db is not None:
-        create_default_admin(db)
+@app.exception_handler(DatabaseUnavailable)
+async def database_unavailable(request: Request, exc: DatabaseUnavailable):
+    """Fail fast while the circuit is open, serving stale public content where we have it"""
+    if settings.SERVE_STALE_ON_DB_OUTAGE:
+        response = await stale_response(request)
+        if response is not None:
+            return response
+    return JSONResponse(status_code=exc.status_code, content={"detail": exc.detail}, headers=exc.headers)
+
+@app.exception_handler(ConnectionFailure)
+async def database_connection_failed(request: Request, exc: ConnectionFailure):
+    """A request lost its connection or found no server: count it against the circuit"""
+    print(f"Database connection failure on {request.url.path}: {exc}")
+    database_breaker.record_failure()
+    return await database_unavailable(request, DatabaseUnavailable())
 
 # Create media directory if it doesn't exist
 if not os.path.exists("media"):
     os.makedirs("media")
 
-# Serve static files from the 'media' directory
-app.mount("/media", StaticFiles(directory="media"), name="media")
+# Serve uploaded media with long-lived caching and precompressed variants
+app.mount("/media", MediaFiles(directory="media"), name="media")
+
+# Abort oversized uploads while the body is still streaming in
+app.add_middleware(UploadLimitMiddleware)
 
-# CORS middleware
+# CORS middleware (added last so it also wraps the middleware above)
 app.add_middleware(
     CORSMiddleware,
     allow_origins=[
@@ -42,8 +129,13 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
+    expose_headers=["ETag", "Link", "X-Next-Cursor"],
 )
 
+# Outermost, so latency covers every other middleware too
+app.add_middleware(MetricsMiddleware)
+register_runtime_gauges()
+
 # Public routes
 app.include_router(auth.router, prefix="/auth", tags=["Auth"])
 app.include_router(students.router, prefix="/students", tags=["Students"])
@@ -52,6 +144,8 @@ app.include_router(events.router, prefix="/events", tags=["Events"])
 app.include_router(library.router, prefix="/library", tags=["Library"])
 app.include_router(classes.router, prefix="/classes", tags=["Classes"])
 app.include_router(gallery.router, prefix="/gallery", tags=["Gallery"])
+app.include_router(search_routes.router, prefix="/search", tags=["Search"])
+app.include_router(public_routes.router, prefix="/public", tags=["Public"])
 app.include_router(content_routes.public_router, prefix="/content", tags=["Content"])
 app.include_router(contact_enquiry_routes.public_router, prefix="/contact-enquiries", tags=["Contact Enquiries"])
 
@@ -61,13 +155,32 @@ app.include_router(faculty.router, prefix="/admin/faculties", tags=["Faculties"]
 app.include_router(users.router, prefix="/admin/users", tags=["Users"])
 app.include_router(roles.router, prefix="/admin/roles", tags=["Roles"])
 app.include_router(contact_enquiry_routes.admin_router, prefix="/admin/contact-enquiries", tags=["Contact Enquiries Management"])
+app.include_router(slow_query_routes.router, prefix="/admin/slow-queries", tags=["Slow Queries"])
 
 @app.get("/")
 async def root():
     return {"message": "Welcome to Jnani Study Centre API"}
 
+@app.get("/metrics", include_in_schema=False)
+async def metrics():
+    """Prometheus scrape endpoint for this worker"""
+    return Response(content=render_metrics(), media_type=METRICS_CONTENT_TYPE)
+
 @app.get("/health")
 async def health_check():
-    if get_database() is None:
-        raise HTTPException(status_code=503, detail="Database connection failed")
-    return {"status": "healthy", "database": "connected"} 
\ No newline at end of file
+    """Liveness: the process is up and serving, whatever the database state"""
+    return {"status": "alive"}
+
+@app.get("/ready")
+async def readiness_check():
+    """Readiness: bootstrap has finished and the database circuit is closed"""
+    if not is_connected() or not app.state.ready or database_breaker.state != CLOSED:
+        return JSONResponse(
+            status_code=503,
+            content={
+                "status": "starting" if not app.state.ready else "unavailable",
+                "database": "connected" if is_connected() else "unavailable",
+                "circuit": database_breaker.stats(),
+            },
+        )
+    return {"status": "ready", "database": "connected", "circuit": database_breaker.stats(), "pool": database_pool_stats()}
@@ -3,7 +3,7 @@ from app.schemas.user import AdminLogin
 from app.schemas.token import Token
 from app.services.auth import create_access_token, authenticate_user, get_current_user
 from app.db.database import get_database
-from pymongo.database import Database
+from pymongo.asynchronous.database import AsyncDatabase
 from datetime import timedelta
 
 router = APIRouter()
@@ -11,9 +11,9 @@ router = APIRouter()
 @router.post("/login", response_model=Token)
 async def login_for_access_token(
     admin_data: AdminLogin,
-    db: Database = Depends(get_database)
+    db: AsyncDatabase = Depends(get_database)
 ):
-    user = authenticate_user(db, admin_data.email, admin_data.password)
+    user = await authenticate_user(db, admin_data.email, admin_data.password)
     if not user:
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
@@ -30,11 +30,11 @@ async def login_for_access_token(
 @router.post("/refresh", response_model=Token)
 async def refresh_access_token(
     current_user: dict = Depends(get_current_user),
-    db: Database = Depends(get_database)
+    db: AsyncDatabase = Depends(get_database)
 ):
     """Refresh the access token for the current user"""
     # Verify the user still exists in the database
-    user = db.users.find_one({"email": current_user["email"]})
+    user = await db.users.find_one({"email": current_user["email"]})
     if not user:
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
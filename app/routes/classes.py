@@ -1,5 +1,5 @@
-from fastapi import APIRouter, Depends, HTTPException
-from typing import List
+from fastapi import APIRouter, Depends, HTTPException, Request, UploadFile, File
+from typing import List, Optional
 from app.schemas.class_schema import Class, ClassCreate, ClassUpdate
 from app.services.class_service import (
     get_all_classes,
@@ -9,43 +9,61 @@ from app.services.class_service import (
 )
 from app.db.database import get_database
 from app.services.auth import get_current_user
-from pymongo.database import Database
+from app.services.bulk_import import bulk_import
+from app.services.cache import cached_response
+from app.services.pagination import PageParams, page_params
+from app.services.fields import field_params
+from pymongo.asynchronous.database import AsyncDatabase
 
 router = APIRouter()
 
 @router.get("/", response_model=List[Class])
 async def read_classes(
-    db: Database = Depends(get_database), 
+    request: Request,
+    params: PageParams = Depends(page_params),
+    fields: Optional[List[str]] = Depends(field_params),
+    db: AsyncDatabase = Depends(get_database), 
     # current_user: dict = Depends(get_current_user)
 ):
-    return get_all_classes(db)
+    return await cached_response(request, db, "classes", lambda: get_all_classes(db, params, fields), List[Class], fields=fields)
 
 @router.post("/", response_model=dict)
 async def create_class(
     class_data: ClassCreate,
-    db: Database = Depends(get_database),
+    db: AsyncDatabase = Depends(get_database),
     current_user: dict = Depends(get_current_user)
 ):
-    class_id = create_new_class(db, class_data)
+    class_id = await create_new_class(db, class_data)
     return {"message": "Class created successfully", "id": class_id}
 
+@router.post("/import", response_model=dict)
+async def import_classes(
+    file: UploadFile = File(...),
+    db: AsyncDatabase = Depends(get_database),
+    current_user: dict = Depends(get_current_user)
+):
+    """
+    Bulk import classes from CSV or NDJSON
+    """
+    return await bulk_import(db, "classes", file)
+
 @router.put("/{class_id}", response_model=dict)
 async def update_class(
     class_id: str,
     class_data: ClassUpdate,
-    db: Database = Depends(get_database),
+    db: AsyncDatabase = Depends(get_database),
     current_user: dict = Depends(get_current_user)
 ):
-    if not update_class_by_id(db, class_id, class_data):
+    if not await update_class_by_id(db, class_id, class_data):
         raise HTTPException(status_code=404, detail="Class not found")
     return {"message": "Class updated successfully"}
 
 @router.delete("/{class_id}", response_model=dict)
 async def delete_class(
     class_id: str, 
-    db: Database = Depends(get_database),
+    db: AsyncDatabase = Depends(get_database),
     current_user: dict = Depends(get_current_user)
 ):
-    if not delete_class_by_id(db, class_id):
+    if not await delete_class_by_id(db, class_id):
         raise HTTPException(status_code=404, detail="Class not found")
     return {"message": "Class deleted successfully"} 
\ No newline at end of file
@@ -1,5 +1,6 @@
-from fastapi import APIRouter, Depends, HTTPException, Query
-from typing import Dict, Any, List
+from fastapi import APIRouter, Depends, HTTPException, Query, Request, Response
+from typing import Dict, Any, List, Optional
+from datetime import datetime
 from app.schemas.contact_enquiry import ContactEnquiryCreate, ContactEnquiryUpdate, ContactEnquiry
 from app.services.contact_enquiry_service import (
     create_contact_enquiry,
@@ -7,11 +8,16 @@ from app.services.contact_enquiry_service import (
     get_contact_enquiry_by_id,
     update_contact_enquiry,
     delete_contact_enquiry,
-    get_contact_enquiries_count
+    get_contact_enquiries_count,
+    export_contact_enquiries,
+    ENQUIRY_EXPORT_FIELDS,
 )
 from app.db.database import get_database
 from app.services.auth import get_current_user
-from pymongo.database import Database
+from app.services.pagination import PageParams, page_params, paged_response
+from app.services.fields import field_params
+from app.services.export import export_response
+from pymongo.asynchronous.database import AsyncDatabase
 
 public_router = APIRouter()
 admin_router = APIRouter()
@@ -19,11 +25,11 @@ admin_router = APIRouter()
 @public_router.post("/", response_model=dict)
 async def submit_contact_enquiry(
     enquiry_data: ContactEnquiryCreate,
-    db: Database = Depends(get_database)
+    db: AsyncDatabase = Depends(get_database)
 ):
     """Submit a new contact enquiry"""
     try:
-        enquiry_id = create_contact_enquiry(db, enquiry_data)
+        enquiry_id = await create_contact_enquiry(db, enquiry_data)
         return {
             "message": "Contact enquiry submitted successfully",
             "id": enquiry_id
@@ -33,23 +39,40 @@ async def submit_contact_enquiry(
 
 @admin_router.get("/", response_model=List[ContactEnquiry])
 async def get_contact_enquiries(
-    skip: int = Query(0, ge=0),
-    limit: int = Query(100, ge=1, le=1000),
-    db: Database = Depends(get_database),
+    request: Request,
+    response: Response,
+    skip: int = Query(0, ge=0, description="Deprecated offset paging; prefer cursor"),
+    params: PageParams = Depends(page_params),
+    fields: Optional[List[str]] = Depends(field_params),
+    q: Optional[str] = Query(None, max_length=200, description="Full-text search; matches are ordered by relevance"),
+    db: AsyncDatabase = Depends(get_database),
     current_user: Dict[str, Any] = Depends(get_current_user)
 ):
     """Get all contact enquiries (admin only)"""
-    enquiries = get_all_contact_enquiries(db, skip, limit)
-    return enquiries
+    enquiries = await get_all_contact_enquiries(db, params, skip, fields, q)
+    return paged_response(request, response, enquiries, ContactEnquiry, fields)
+
+@admin_router.get("/export")
+async def export_enquiries(
+    format: str = Query("csv", pattern="^(csv|ndjson)$"),
+    status: Optional[str] = Query(None, pattern="^(pending|read|replied|closed)$"),
+    created_from: Optional[datetime] = Query(None, alias="from", description="Only enquiries created at or after this time"),
+    created_to: Optional[datetime] = Query(None, alias="to", description="Only enquiries created before this time"),
+    db: AsyncDatabase = Depends(get_database),
+    current_user: Dict[str, Any] = Depends(get_current_user)
+):
+    """Stream contact enquiries as CSV or NDJSON (admin only)"""
+    cursor = export_contact_enquiries(db, status, created_from, created_to)
+    return export_response(cursor, ENQUIRY_EXPORT_FIELDS, format, "contact-enquiries")
 
 @admin_router.get("/{enquiry_id}", response_model=ContactEnquiry)
 async def get_contact_enquiry(
     enquiry_id: str,
-    db: Database = Depends(get_database),
+    db: AsyncDatabase = Depends(get_database),
     current_user: Dict[str, Any] = Depends(get_current_user)
 ):
     """Get contact enquiry by ID (admin only)"""
-    enquiry = get_contact_enquiry_by_id(db, enquiry_id)
+    enquiry = await get_contact_enquiry_by_id(db, enquiry_id)
     if not enquiry:
         raise HTTPException(status_code=404, detail="Contact enquiry not found")
     return enquiry
@@ -58,11 +81,11 @@ async def get_contact_enquiry(
 async def update_enquiry(
     enquiry_id: str,
     update_data: ContactEnquiryUpdate,
-    db: Database = Depends(get_database),
+    db: AsyncDatabase = Depends(get_database),
     current_user: Dict[str, Any] = Depends(get_current_user)
 ):
     """Update contact enquiry status and notes (admin only)"""
-    success = update_contact_enquiry(db, enquiry_id, update_data)
+    success = await update_contact_enquiry(db, enquiry_id, update_data)
     if not success:
         raise HTTPException(status_code=404, detail="Contact enquiry not found")
     
@@ -71,11 +94,11 @@ async def update_enquiry(
 @admin_router.delete("/{enquiry_id}", response_model=dict)
 async def delete_enquiry(
     enquiry_id: str,
-    db: Database = Depends(get_database),
+    db: AsyncDatabase = Depends(get_database),
     current_user: Dict[str, Any] = Depends(get_current_user)
 ):
     """Delete contact enquiry (admin only)"""
-    success = delete_contact_enquiry(db, enquiry_id)
+    success = await delete_contact_enquiry(db, enquiry_id)
     if not success:
         raise HTTPException(status_code=404, detail="Contact enquiry not found")
     
@@ -83,9 +106,9 @@ async def delete_enquiry(
 
 @admin_router.get("/stats/counts", response_model=dict)
 async def get_enquiry_counts(
-    db: Database = Depends(get_database),
+    db: AsyncDatabase = Depends(get_database),
     current_user: Dict[str, Any] = Depends(get_current_user)
 ):
     """Get contact enquiry counts by status (admin only)"""
-    counts = get_contact_enquiries_count(db)
+    counts = await get_contact_enquiries_count(db)
     return counts 
\ No newline at end of file
@@ -13,52 +13,56 @@ from app.services.content_service import (
 )
 from app.db.database import get_database
 from app.services.auth import get_current_user
-from pymongo.database import Database
+from app.services.cache import cached_response
+from pymongo.asynchronous.database import AsyncDatabase
 
 public_router = APIRouter()
 admin_router = APIRouter()
 
 @public_router.get("/", response_model=Any)
-async def get_public_content(db: Database = Depends(get_database)):
+async def get_public_content(request: Request, db: AsyncDatabase = Depends(get_database)):
     """
     This endpoint fetches all combined content (about, contact, social) 
     for the public-facing website.
     """
-    # content_data = get_content_by_type(db, "main_content")
-    content_data = get_all_content(db)
-    # print(content_data)
-    # return content_data
-    if not content_data:
-        # If no content exists, create a default one
-        default_content = {
-            "about_us": "Welcome to Jnani Study Center.",
-            "contact_us": {
-                "mobile": "",
-                "address": ""
-            },
-            "map_link": "https://maps.google.com",
-            "social_media": {
-                "facebook": "",
-                "youtube": ""
-            }
-        }
-        # from app.services.content_service import create_new_content
-        # content_id = create_new_content(db, {"content_type": "main_content", "data": default_content})
+    async def load_content():
         # content_data = get_content_by_type(db, "main_content")
+        content_data = await get_all_content(db)
+        # print(content_data)
+        # return content_data
+        if not content_data:
+            # If no content exists, create a default one
+            default_content = {
+                "about_us": "Welcome to Jnani Study Center.",
+                "contact_us": {
+                    "mobile": "",
+                    "address": ""
+                },
+                "map_link": "https://maps.google.com",
+                "social_media": {
+                    "facebook": "",
+                    "youtube": ""
+                }
+            }
+            # from app.services.content_service import create_new_content
+            # content_id = create_new_content(db, {"content_type": "main_content", "data": default_content})
+            # content_data = get_content_by_type(db, "main_content")
 
-    if not content_data:
-        raise HTTPException(status_code=404, detail="Content not found")
-        
-    return content_data
+        if not content_data:
+            raise HTTPException(status_code=404, detail="Content not found")
+
+        return content_data
+
+    return await cached_response(request, db, "content", load_content)
 
 @admin_router.get("/{content_type}", response_model=Any)
 async def get_admin_content(
     content_type: str,
-    db: Database = Depends(get_database)
+    db: AsyncDatabase = Depends(get_database)
     # current_user: Dict[str, Any] = Depends(get_current_user)
 ):
     # Get all content and filter by type
-    all_content = get_all_content(db)
+    all_content = await get_all_content(db)
     
     # Extract the specific content type from the structured data
     if content_type == "about":
@@ -94,7 +98,7 @@ async def get_admin_content(
 async def update_content(
     content_type: str,
     request: Request,
-    db: Database = Depends(get_database),
+    db: AsyncDatabase = Depends(get_database),
     # current_user: Dict[str, Any] = Depends(get_current_user)
 ):
     try:
@@ -114,7 +118,7 @@ async def update_content(
         print("Validated content:", content)
         
         # Update or create the content
-        success = update_content_by_type(db, content_type, content.model_dump(exclude_unset=True))
+        success = await update_content_by_type(db, content_type, content.model_dump(exclude_unset=True))
         
         if success:
             return {"message": "Content updated successfully"}
@@ -1,5 +1,5 @@
-from fastapi import APIRouter, Depends, HTTPException
-from typing import List
+from fastapi import APIRouter, Depends, HTTPException, Request, UploadFile, File, Query
+from typing import List, Optional
 from app.schemas.course import Course, CourseCreate
 from app.services.course_service import (
     get_all_courses,
@@ -9,40 +9,61 @@ from app.services.course_service import (
 )
 from app.db.database import get_database
 from app.services.auth import get_current_user
-from pymongo.database import Database
+from app.services.bulk_import import bulk_import
+from app.services.cache import cached_response
+from app.services.pagination import PageParams, page_params
+from app.services.fields import field_params
+from pymongo.asynchronous.database import AsyncDatabase
 
 router = APIRouter()
 
 @router.get("/", response_model=List[Course])
-async def read_courses(db: Database = Depends(get_database)):
-    return get_all_courses(db)
+async def read_courses(
+    request: Request,
+    params: PageParams = Depends(page_params),
+    fields: Optional[List[str]] = Depends(field_params),
+    q: Optional[str] = Query(None, max_length=200, description="Full-text search; matches are ordered by relevance"),
+    db: AsyncDatabase = Depends(get_database)
+):
+    return await cached_response(request, db, "courses", lambda: get_all_courses(db, params, fields, q), List[Course], fields=fields)
 
 @router.post("/", response_model=dict)
 async def create_course(
     course: CourseCreate, 
-    db: Database = Depends(get_database),
+    db: AsyncDatabase = Depends(get_database),
     current_user: str = Depends(get_current_user)
 ):
-    course_id = create_new_course(db, course)
+    course_id = await create_new_course(db, course)
     return {"message": "Course created successfully", "id": course_id}
 
+@router.post("/import", response_model=dict)
+async def import_courses(
+    file: UploadFile = File(...),
+    db: AsyncDatabase = Depends(get_database),
+    current_user: str = Depends(get_current_user)
+):
+    """
+    Bulk import courses from CSV or NDJSON
+    """
+    return await bulk_import(db, "courses", file)
+
 @router.put("/{course_id}", response_model=dict)
 async def update_course(
     course_id: str, 
     course: CourseCreate, 
-    db: Database = Depends(get_database),
+    db: AsyncDatabase = Depends(get_database),
     current_user: str = Depends(get_current_user)
 ):
-    if not update_course_by_id(db, course_id, course):
+    if not await update_course_by_id(db, course_id, course):
         raise HTTPException(status_code=404, detail="Course not found")
     return {"message": "Course updated successfully"}
 
 @router.delete("/{course_id}", response_model=dict)
 async def delete_course(
     course_id: str, 
-    db: Database = Depends(get_database),
+    db: AsyncDatabase = Depends(get_database),
     current_user: str = Depends(get_current_user)
 ):
-    if not delete_course_by_id(db, course_id):
+    if not await delete_course_by_id(db, course_id):
         raise HTTPException(status_code=404, detail="Course not found")
     return {"message": "Course deleted successfully"} 
\ No newline at end of file
@@ -1,17 +1,28 @@
-from fastapi import APIRouter, Depends, HTTPException, UploadFile, File, Form
+from fastapi import APIRouter, Depends, HTTPException, UploadFile, File, Form, Request, Query
 from typing import List, Optional
 import json
 from datetime import datetime
 from app.schemas.event import Event, EventCreate, EventUpdate
 from app.services.event_service import (
     get_all_events,
+    get_carousel_items,
+    get_section_events,
+    CAROUSEL_LIMIT,
+    SECTION_LIMIT,
     create_new_event,
     update_event_by_id,
     delete_event_by_id,
+    get_event_video_path,
 )
 from app.db.database import get_database
 from app.services.auth import get_current_user
-from pymongo.database import Database
+from app.services.cache import cached_response
+from app.services.pagination import MAX_PAGE_SIZE, PageParams, page_params
+from app.services.fields import field_params
+from app.services.media_files import VideoFileResponse
+from pymongo.asynchronous.database import AsyncDatabase
+from starlette.concurrency import run_in_threadpool
+import os
 
 router = APIRouter()
 
@@ -25,63 +36,66 @@ def event_from_json(event_json: str = Form(...)) -> EventCreate:
 
 @router.get("/", response_model=List[Event])
 async def read_events(
-    db: Database = Depends(get_database)
+    request: Request,
+    params: PageParams = Depends(page_params),
+    fields: Optional[List[str]] = Depends(field_params),
+    q: Optional[str] = Query(None, max_length=200, description="Full-text search; matches are ordered by relevance"),
+    db: AsyncDatabase = Depends(get_database)
 ):
-    return get_all_events(db)
+    return await cached_response(request, db, "events", lambda: get_all_events(db, params, fields, q), List[Event], fields=fields)
 
 @router.get("/carousel", response_model=List[dict])
 async def get_carousel_images(
-    db: Database = Depends(get_database)
+    request: Request,
+    limit: int = Query(CAROUSEL_LIMIT, ge=1, le=MAX_PAGE_SIZE),
+    when: Optional[str] = Query(None, pattern="^(upcoming|past)$"),
+    db: AsyncDatabase = Depends(get_database)
 ):
     """
     Get images from active events for carousel display
     """
-    events = get_all_events(db)
-    carousel_items = []
-    
-    for event in events:
-        if event.get("is_active", True) and event.get("image_url"):
-            carousel_items.append({
-                "id": event.get("id"),
-                "title": event.get("title"),
-                "description": event.get("description"),
-                "image_url": event.get("image_url")
-            })
-    
-    return carousel_items
+    if when:
+        # Time windows change with the clock, not the events version, so skip the cache and ETag
+        return await get_carousel_items(db, limit, when)
+    return await cached_response(request, db, "events", lambda: get_carousel_items(db, limit, when), List[dict])
 
 @router.get("/section", response_model=List[dict])
 async def get_events_section(
-    db: Database = Depends(get_database)
+    request: Request,
+    limit: int = Query(SECTION_LIMIT, ge=1, le=MAX_PAGE_SIZE),
+    when: Optional[str] = Query(None, pattern="^(upcoming|past)$"),
+    has_video: Optional[bool] = Query(None),
+    db: AsyncDatabase = Depends(get_database)
 ):
     """
     Get events with videos for the events section
     """
-    events = get_all_events(db)
-    section_events = []
-    
-    for event in events:
-        if event.get("is_active", True):
-            section_events.append({
-                "id": event.get("id"),
-                "title": event.get("title"),
-                "description": event.get("description"),
-                "event_date": event.get("event_date"),
-                "image_url": event.get("image_url"),
-                "video_url": event.get("video_url")
-            })
-    
-    return section_events
+    if when:
+        return await get_section_events(db, limit, when, has_video)
+    return await cached_response(request, db, "events", lambda: get_section_events(db, limit, when, has_video), List[dict])
+
+@router.get("/{event_id}/video", response_class=VideoFileResponse)
+async def stream_event_video(
+    event_id: str,
+    db: AsyncDatabase = Depends(get_database)
+):
+    """
+    Stream an event's video with HTTP Range support so players can seek
+    """
+    video_path = await get_event_video_path(db, event_id)
+    if not video_path or not await run_in_threadpool(os.path.isfile, video_path):
+        raise HTTPException(status_code=404, detail="Video not found")
+    return VideoFileResponse(video_path)
 
 @router.post("/", response_model=dict)
 async def create_event(
     event: EventCreate = Depends(event_from_json),
     image: Optional[UploadFile] = File(None),
     video: Optional[UploadFile] = File(None),
-    db: Database = Depends(get_database),
+    db: AsyncDatabase = Depends(get_database),
     current_user: dict = Depends(get_current_user)
 ):
-    event_id = create_new_event(db, event, image, video)
+    event_id = await create_new_event(db, event, image, video)
     return {"message": "Event created successfully", "id": event_id}
 
 @router.put("/{event_id}", response_model=dict)
@@ -90,19 +104,19 @@ async def update_event(
     event: EventUpdate = Depends(event_from_json),
     image: Optional[UploadFile] = File(None),
     video: Optional[UploadFile] = File(None),
-    db: Database = Depends(get_database),
+    db: AsyncDatabase = Depends(get_database),
     current_user: dict = Depends(get_current_user)
 ):
-    if not update_event_by_id(db, event_id, event, image, video):
+    if not await update_event_by_id(db, event_id, event, image, video):
         raise HTTPException(status_code=404, detail="Event not found")
     return {"message": "Event updated successfully"}
 
 @router.delete("/{event_id}", response_model=dict)
 async def delete_event(
     event_id: str, 
-    db: Database = Depends(get_database),
+    db: AsyncDatabase = Depends(get_database),
     current_user: dict = Depends(get_current_user)
 ):
-    if not delete_event_by_id(db, event_id):
+    if not await delete_event_by_id(db, event_id):
         raise HTTPException(status_code=404, detail="Event not found")
     return {"message": "Event deleted successfully"} 
\ No newline at end of file
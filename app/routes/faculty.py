@@ -1,4 +1,4 @@
-from fastapi import APIRouter, Depends, HTTPException, UploadFile, File, Form
+from fastapi import APIRouter, Depends, HTTPException, UploadFile, File, Form, Query, Request, Response
 from typing import List, Optional
 from app.schemas.faculty import Faculty, FacultyCreate
 from app.services.faculty_service import (
@@ -9,16 +9,36 @@ from app.services.faculty_service import (
 )
 from app.db.database import get_database
 from app.services.auth import get_current_user
-from pymongo.database import Database
+from app.services.bulk_import import bulk_import
+from app.services.typeahead import MAX_SUGGESTIONS, faculty_typeahead, suggest
+from app.services.pagination import PageParams, page_params, paged_response
+from app.services.fields import field_params
+from pymongo.asynchronous.database import AsyncDatabase
 
 router = APIRouter()
 
 @router.get("/", response_model=List[Faculty])
 async def read_faculties(
-    db: Database = Depends(get_database), 
+    request: Request,
+    response: Response,
+    params: PageParams = Depends(page_params),
+    fields: Optional[List[str]] = Depends(field_params),
+    db: AsyncDatabase = Depends(get_database), 
     current_user: dict = Depends(get_current_user)
 ):
-    return get_all_faculties(db)
+    return paged_response(request, response, await get_all_faculties(db, params, fields), Faculty, fields)
+
+@router.get("/suggest", response_model=List[dict])
+async def suggest_faculties(
+    q: str = Query(..., min_length=1, max_length=100),
+    limit: int = Query(10, ge=1, le=MAX_SUGGESTIONS),
+    db: AsyncDatabase = Depends(get_database),
+    current_user: dict = Depends(get_current_user)
+):
+    """
+    Typeahead lookup of faculties by name or subject, served from memory
+    """
+    return await suggest(db, faculty_typeahead, q, limit)
 
 @router.post("/", response_model=dict)
 async def create_faculty(
@@ -27,7 +47,7 @@ async def create_faculty(
     qualification: str = Form(...),
     experience: int = Form(...),
     profile_image: Optional[UploadFile] = File(None),
-    db: Database = Depends(get_database),
+    db: AsyncDatabase = Depends(get_database),
     current_user: dict = Depends(get_current_user)
 ):
     faculty_create = FacultyCreate(
@@ -36,9 +56,21 @@ async def create_faculty(
         qualification=qualification,
         experience=experience
     )
-    faculty_id = create_new_faculty(db, faculty_create, profile_image)
+    faculty_id = await create_new_faculty(db, faculty_create, profile_image)
     return {"message": "Faculty created successfully", "id": faculty_id}
 
+@router.post("/import", response_model=dict)
+async def import_faculties(
+    file: UploadFile = File(...),
+    images: Optional[UploadFile] = File(None),
+    db: AsyncDatabase = Depends(get_database),
+    current_user: dict = Depends(get_current_user)
+):
+    """
+    Bulk import faculties from CSV or NDJSON, with an optional zip of profile images
+    """
+    return await bulk_import(db, "faculties", file, images)
+
 @router.put("/{faculty_id}", response_model=dict)
 async def update_faculty(
     faculty_id: str,
@@ -47,7 +79,7 @@ async def update_faculty(
     qualification: str = Form(...),
     experience: int = Form(...),
     profile_image: Optional[UploadFile] = File(None),
-    db: Database = Depends(get_database),
+    db: AsyncDatabase = Depends(get_database),
     current_user: dict = Depends(get_current_user)
 ):
     faculty_update = FacultyCreate(
@@ -56,16 +88,16 @@ async def update_faculty(
         qualification=qualification,
         experience=experience,
     )
-    if not update_faculty_by_id(db, faculty_id, faculty_update, profile_image):
+    if not await update_faculty_by_id(db, faculty_id, faculty_update, profile_image):
         raise HTTPException(status_code=404, detail="Faculty not found")
     return {"message": "Faculty updated successfully"}
 
 @router.delete("/{faculty_id}", response_model=dict)
 async def delete_faculty(
     faculty_id: str, 
-    db: Database = Depends(get_database),
+    db: AsyncDatabase = Depends(get_database),
     current_user: dict = Depends(get_current_user)
 ):
-    if not delete_faculty_by_id(db, faculty_id):
+    if not await delete_faculty_by_id(db, faculty_id):
         raise HTTPException(status_code=404, detail="Faculty not found")
     return {"message": "Faculty deleted successfully"} 
\ No newline at end of file
@@ -1,4 +1,4 @@
-from fastapi import APIRouter, Depends, HTTPException, UploadFile, File, Form
+from fastapi import APIRouter, Depends, HTTPException, UploadFile, File, Form, Request, Query
 from typing import List, Optional, Any
 import json
 from app.schemas.library import LibraryItem, LibraryItemCreate, LibraryItemUpdate
@@ -10,7 +10,10 @@ from app.services.library_service import (
 )
 from app.db.database import get_database
 from app.services.auth import get_current_user
-from pymongo.database import Database
+from app.services.cache import cached_response
+from app.services.pagination import PageParams, page_params
+from app.services.fields import field_params
+from pymongo.asynchronous.database import AsyncDatabase
 
 router = APIRouter()
 
@@ -23,18 +26,22 @@ def item_from_json(item_json: str = Form(...)) -> LibraryItemCreate:
 
 @router.get("/", response_model=List[LibraryItem])
 async def read_library_items(
-    db: Database = Depends(get_database)
+    request: Request,
+    params: PageParams = Depends(page_params),
+    fields: Optional[List[str]] = Depends(field_params),
+    q: Optional[str] = Query(None, max_length=200, description="Full-text search; matches are ordered by relevance"),
+    db: AsyncDatabase = Depends(get_database)
 ):
-    return get_all_library_items(db)
+    return await cached_response(request, db, "library", lambda: get_all_library_items(db, params, fields, q), List[LibraryItem], fields=fields)
 
 @router.post("/", response_model=dict)
 async def create_library_item(
     item: LibraryItemCreate = Depends(item_from_json),
     file: Optional[UploadFile] = File(None),
-    db: Database = Depends(get_database),
+    db: AsyncDatabase = Depends(get_database),
     current_user: dict = Depends(get_current_user)
 ):
-    item_id = create_new_library_item(db, item, file)
+    item_id = await create_new_library_item(db, item, file)
     return {"message": "Library item created successfully", "id": item_id}
 
 @router.put("/{item_id}", response_model=dict)
@@ -42,19 +49,19 @@ async def update_library_item(
     item_id: str,
     item: LibraryItemUpdate = Depends(item_from_json),
     file: Optional[UploadFile] = File(None),
-    db: Database = Depends(get_database),
+    db: AsyncDatabase = Depends(get_database),
     current_user: dict = Depends(get_current_user)
 ):
-    if not update_library_item_by_id(db, item_id, item, file):
+    if not await update_library_item_by_id(db, item_id, item, file):
         raise HTTPException(status_code=404, detail="Library item not found")
     return {"message": "Library item updated successfully"}
 
 @router.delete("/{item_id}", response_model=dict)
 async def delete_library_item(
     item_id: str, 
-    db: Database = Depends(get_database),
+    db: AsyncDatabase = Depends(get_database),
     current_user: dict = Depends(get_current_user)
 ):
-    if not delete_library_item_by_id(db, item_id):
+    if not await delete_library_item_by_id(db, item_id):
         raise HTTPException(status_code=404, detail="Library item not found")
     return {"message": "Library item deleted successfully"} 
\ No newline at end of file
@@ -0,0 +1,17 @@
+from fastapi import APIRouter, Depends, Request
+from typing import Any
+from app.db.database import get_database
+from app.services.cache import cached_response
+from app.services.home_service import get_home_bundle
+from app.services.versioning import HOME_NAMESPACE
+from pymongo.asynchronous.database import AsyncDatabase
+
+router = APIRouter()
+
+@router.get("/home", response_model=Any)
+async def get_home(request: Request, db: AsyncDatabase = Depends(get_database)):
+    """
+    Everything the landing page shows in one response: content, carousel,
+    events section, courses and gallery albums
+    """
+    return await cached_response(request, db, HOME_NAMESPACE, lambda: get_home_bundle(db))
@@ -0,0 +1,24 @@
+from fastapi import APIRouter, Depends, Query, Request, Response
+from typing import List, Optional
+from app.schemas.search import SearchResult
+from app.services.search_service import search_all
+from app.db.database import get_database
+from app.services.pagination import PageParams, page_params, paged_response
+from pymongo.asynchronous.database import AsyncDatabase
+
+router = APIRouter()
+
+@router.get("/", response_model=List[SearchResult])
+async def search(
+    request: Request,
+    response: Response,
+    q: str = Query(..., min_length=1, max_length=200),
+    types: Optional[str] = Query(None, description="Comma-separated subset of library,events,courses"),
+    params: PageParams = Depends(page_params),
+    db: AsyncDatabase = Depends(get_database)
+):
+    """
+    Search the library, events and courses, best match first
+    """
+    type_list = [t.strip() for t in types.split(",") if t.strip()] if types else None
+    return paged_response(request, response, await search_all(db, q, type_list, params))
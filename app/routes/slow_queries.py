@@ -0,0 +1,25 @@
+from fastapi import APIRouter, Depends, Query, Request, Response
+from typing import List, Optional
+from app.db.database import get_database
+from app.services.auth import get_current_user
+from app.services.pagination import PageParams, page_params, paged_response
+from app.services.slow_queries import get_slow_queries
+from pymongo.asynchronous.database import AsyncDatabase
+
+router = APIRouter()
+
+@router.get("/", response_model=List[dict])
+async def read_slow_queries(
+    request: Request,
+    response: Response,
+    params: PageParams = Depends(page_params),
+    collection: Optional[str] = Query(None),
+    route: Optional[str] = Query(None, description='Route as logged, e.g. "GET /admin/students/"'),
+    collscan: Optional[bool] = Query(None, description="Only entries whose explained plan did (or did not) scan the collection"),
+    db: AsyncDatabase = Depends(get_database),
+    current_user: dict = Depends(get_current_user)
+):
+    """
+    Recent Mongo commands slower than SLOW_QUERY_MS, newest first
+    """
+    return paged_response(request, response, await get_slow_queries(db, params, collection, route, collscan))
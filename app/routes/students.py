@@ -1,4 +1,4 @@
-from fastapi import APIRouter, Depends, HTTPException, UploadFile, File, Form
+from fastapi import APIRouter, Depends, HTTPException, UploadFile, File, Form, Query, Request, Response
 from typing import List, Optional
 import json
 from app.schemas.student import Student, StudentCreate, StudentUpdate
@@ -7,10 +7,17 @@ from app.services.student_service import (
     create_new_student,
     update_student_by_id,
     delete_student_by_id,
+    export_students,
+    STUDENT_EXPORT_FIELDS,
 )
 from app.db.database import get_database
 from app.services.auth import get_current_user
-from pymongo.database import Database
+from app.services.bulk_import import bulk_import
+from app.services.typeahead import MAX_SUGGESTIONS, student_typeahead, suggest
+from app.services.export import export_response
+from app.services.pagination import PageParams, page_params, paged_response
+from app.services.fields import field_params
+from pymongo.asynchronous.database import AsyncDatabase
 
 router = APIRouter()
 
@@ -23,39 +30,79 @@ def student_from_json(student_json: str = Form(...)) -> StudentCreate:
 
 @router.get("/", response_model=List[Student])
 async def read_students(
-    db: Database = Depends(get_database), 
+    request: Request,
+    response: Response,
+    params: PageParams = Depends(page_params),
+    fields: Optional[List[str]] = Depends(field_params),
+    db: AsyncDatabase = Depends(get_database), 
     current_user: dict = Depends(get_current_user)
 ):
-    return get_all_students(db)
+    return paged_response(request, response, await get_all_students(db, params, fields), Student, fields)
+
+@router.get("/export")
+async def export_student_roster(
+    format: str = Query("csv", pattern="^(csv|ndjson)$"),
+    class_name: Optional[str] = None,
+    db: AsyncDatabase = Depends(get_database),
+    current_user: dict = Depends(get_current_user)
+):
+    """
+    Stream the student roster as CSV or NDJSON
+    """
+    return export_response(export_students(db, class_name), STUDENT_EXPORT_FIELDS, format, "students")
+
+@router.get("/suggest", response_model=List[dict])
+async def suggest_students(
+    q: str = Query(..., min_length=1, max_length=100),
+    limit: int = Query(10, ge=1, le=MAX_SUGGESTIONS),
+    db: AsyncDatabase = Depends(get_database),
+    current_user: dict = Depends(get_current_user)
+):
+    """
+    Typeahead lookup of students by name or parent name, served from memory
+    """
+    return await suggest(db, student_typeahead, q, limit)
 
 @router.post("/", response_model=dict)
 async def create_student(
     student: StudentCreate = Depends(student_from_json),
     profile_image: Optional[UploadFile] = File(None),
-    db: Database = Depends(get_database),
+    db: AsyncDatabase = Depends(get_database),
     current_user: dict = Depends(get_current_user)
 ):
-    student_id = create_new_student(db, student, profile_image)
+    student_id = await create_new_student(db, student, profile_image)
     return {"message": "Student created successfully", "id": student_id}
 
+@router.post("/import", response_model=dict)
+async def import_students(
+    file: UploadFile = File(...),
+    images: Optional[UploadFile] = File(None),
+    db: AsyncDatabase = Depends(get_database),
+    current_user: dict = Depends(get_current_user)
+):
+    """
+    Bulk import students from CSV or NDJSON, with an optional zip of profile images
+    """
+    return await bulk_import(db, "students", file, images)
+
 @router.put("/{student_id}", response_model=dict)
 async def update_student(
     student_id: str,
     student: StudentUpdate = Depends(student_from_json),
     profile_image: Optional[UploadFile] = File(None),
-    db: Database = Depends(get_database),
+    db: AsyncDatabase = Depends(get_database),
     current_user: dict = Depends(get_current_user)
 ):
-    if not update_student_by_id(db, student_id, student, profile_image):
+    if not await update_student_by_id(db, student_id, student, profile_image):
         raise HTTPException(status_code=404, detail="Student not found")
     return {"message": "Student updated successfully"}
 
 @router.delete("/{student_id}", response_model=dict)
 async def delete_student(
     student_id: str, 
-    db: Database = Depends(get_database),
+    db: AsyncDatabase = Depends(get_database),
     current_user: dict = Depends(get_current_user)
 ):
-    if not delete_student_by_id(db, student_id):
+    if not await delete_student_by_id(db, student_id):
         raise HTTPException(status_code=404, detail="Student not found")
     return {"message": "Student deleted successfully"} 
\ No newline at end of file
@@ -3,6 +3,20 @@ from typing import List, Optional
 from datetime import datetime
 from .py_object_id import PyObjectId
 
+MEDIA_BASE_URL = "https://jnani-backend.onrender.com"
+
+def _full_url(path: str) -> str:
+    if path and not path.startswith('http'):
+        return f"{MEDIA_BASE_URL}/{path}"
+    return path
+
+class ImageVariant(BaseModel):
+    width: int
+    height: int
+    format: str
+    file_path: str
+    file_size: int
+
 class ImageBase(BaseModel):
     filename: str
     original_filename: str
@@ -17,6 +31,7 @@ class ImageCreate(ImageBase):
 class Image(ImageBase):
     id: str
     album_id: str
+    variants: List[ImageVariant] = []
     created_at: datetime
     updated_at: datetime
 
@@ -41,13 +56,31 @@ class AlbumImage(BaseModel):
     file_path: str
     alt_text: Optional[str] = None
     uploaded_at: datetime = Field(..., alias="created_at")
+    variants: List[ImageVariant] = Field(default=[], exclude=True)
 
     @model_validator(mode='after')
     def build_full_url(self):
-        if self.file_path and not self.file_path.startswith('http'):
-            self.file_path = f"https://jnani-backend.onrender.com/{self.file_path}"
+        self.file_path = _full_url(self.file_path)
+        for variant in self.variants:
+            variant.file_path = _full_url(variant.file_path)
         return self
 
+    def _srcset(self, format: str) -> Optional[str]:
+        candidates = [f"{v.file_path} {v.width}w" for v in self.variants if v.format == format]
+        return ", ".join(candidates) or None
+
+    @computed_field
+    @property
+    def srcset(self) -> Optional[str]:
+        """WebP candidates for <source srcset>; None until variants are generated"""
+        return self._srcset("webp")
+
+    @computed_field
+    @property
+    def jpeg_srcset(self) -> Optional[str]:
+        """JPEG fallback candidates for <img srcset>"""
+        return self._srcset("jpeg")
+
     class Config:
         populate_by_name = True
         from_attributes = True
@@ -0,0 +1,9 @@
+from pydantic import BaseModel
+from typing import Optional
+
+class SearchResult(BaseModel):
+    type: str
+    id: str
+    title: Optional[str] = None
+    summary: Optional[str] = None
+    score: float
@@ -1,21 +1,59 @@
 from fastapi import Depends, HTTPException, status
 from fastapi.security import HTTPBearer, HTTPAuthorizationCredentials
 from passlib.context import CryptContext
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime, timedelta
 from typing import Optional
+import asyncio
+import uuid
 import jwt
 from app.config import settings
 from app.db.database import get_database
-from pymongo.database import Database
+from app.services.cache import MemoryCache
+from pymongo.asynchronous.database import AsyncDatabase
 
 pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
 security = HTTPBearer()
 
-def verify_password(plain_password, hashed_password):
-    return pwd_context.verify(plain_password, hashed_password)
+# bcrypt releases the GIL, so a small thread pool keeps hashing off the
+# event loop without the pickling overhead of a process pool
+password_hash_executor = ThreadPoolExecutor(
+    max_workers=settings.PASSWORD_HASH_WORKERS,
+    thread_name_prefix="password-hash"
+)
+_password_jobs_pending = 0
 
-def get_password_hash(password):
-    return pwd_context.hash(password)
+# Users resolved from a token, namespaced by email so user and role
+# writes can drop them. Always in-process: it holds full user documents.
+principal_cache = MemoryCache(
+    max_entries=settings.PRINCIPAL_CACHE_MAX_ENTRIES,
+    ttl=settings.PRINCIPAL_CACHE_TTL_SECONDS
+)
+
+def password_hash_queue_depth() -> int:
+    """Number of hash/verify jobs submitted to the executor and not yet finished"""
+    return _password_jobs_pending
+
+async def _run_password_job(func, *args):
+    global _password_jobs_pending
+    if _password_jobs_pending >= settings.PASSWORD_HASH_MAX_QUEUE:
+        raise HTTPException(
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+            detail="Too many authentication requests, please retry shortly",
+            headers={"Retry-After": "1"},
+        )
+    _password_jobs_pending += 1
+    try:
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(password_hash_executor, func, *args)
+    finally:
+        _password_jobs_pending -= 1
+
+async def verify_password(plain_password, hashed_password):
+    return await _run_password_job(pwd_context.verify, plain_password, hashed_password)
+
+async def get_password_hash(password):
+    return await _run_password_job(pwd_context.hash, password)
 
 def create_access_token(data: dict, expires_delta: Optional[timedelta] = None):
     to_encode = data.copy()
@@ -24,19 +62,20 @@ def create_access_token(data: dict, expires_delta: Optional[timedelta] = None):
     else:
         expire = datetime.utcnow() + timedelta(minutes=settings.ACCESS_TOKEN_EXPIRE_MINUTES)
     to_encode.update({"exp": expire})
+    to_encode.setdefault("jti", uuid.uuid4().hex)
     encoded_jwt = jwt.encode(to_encode, settings.SECRET_KEY, algorithm=settings.ALGORITHM)
     return encoded_jwt
 
-def authenticate_user(db: Database, email: str, password: str):
+async def authenticate_user(db: AsyncDatabase, email: str, password: str):
     from app.services import user_service
-    user = user_service.get_user_by_email(db, email)
-    if not user or not verify_password(password, user["hashed_password"]):
+    user = await user_service.get_user_by_email(db, email)
+    if not user or not await verify_password(password, user["hashed_password"]):
         return False
     return user
 
-def get_current_user(
+async def get_current_user(
     credentials: HTTPAuthorizationCredentials = Depends(security),
-    db: Database = Depends(get_database)
+    db: AsyncDatabase = Depends(get_database)
 ):
     try:
         payload = jwt.decode(credentials.credentials, settings.SECRET_KEY, algorithms=[settings.ALGORITHM])
@@ -47,15 +86,20 @@ def get_current_user(
                 detail="Invalid token",
                 headers={"WWW-Authenticate": "Bearer"},
             )
-        from app.services import user_service
-        user = user_service.get_user_by_email(db, email)
+        # Tokens issued before jti was added fall back to the raw token
+        cache_key = f"{email}:{payload.get('jti') or credentials.credentials}"
+        user = await principal_cache.get(cache_key)
         if user is None:
-            raise HTTPException(
-                status_code=status.HTTP_401_UNAUTHORIZED, 
-                detail="User not found",
-                headers={"WWW-Authenticate": "Bearer"},
-            )
-        return user
+            from app.services import user_service
+            user = await user_service.get_user_by_email(db, email)
+            if user is None:
+                raise HTTPException(
+                    status_code=status.HTTP_401_UNAUTHORIZED, 
+                    detail="User not found",
+                    headers={"WWW-Authenticate": "Bearer"},
+                )
+            await principal_cache.set(cache_key, user, namespace=email)
+        return dict(user)
     except jwt.PyJWTError:
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED, 
@@ -0,0 +1,210 @@
+import codecs
+import csv
+import itertools
+import json
+import mimetypes
+import os
+import zipfile
+from dataclasses import dataclass
+from typing import Any, Dict, Iterator, List, Optional, Tuple, Type, get_origin
+from fastapi import HTTPException, UploadFile
+from pydantic import BaseModel, ValidationError
+from pymongo.asynchronous.database import AsyncDatabase
+from pymongo.errors import BulkWriteError
+from starlette.concurrency import run_in_threadpool
+from starlette.datastructures import Headers
+from app.schemas.class_schema import ClassCreate
+from app.schemas.course import CourseCreate
+from app.schemas.faculty import FacultyCreate
+from app.schemas.student import StudentCreate
+from app.services.media_store import store_media, release_media
+from app.services.versioning import collection_changed
+from app.services.typeahead import mark_stale
+
+IMPORT_BATCH_SIZE = 500
+MAX_REPORTED_ERRORS = 500
+# Column naming the row's picture inside the uploaded images zip
+IMAGE_COLUMN = "profile_image"
+# Separator for list-valued fields (e.g. course subjects) in CSV cells
+LIST_SEPARATOR = ";"
+
+@dataclass
+class ImportTarget:
+    collection: str
+    schema: Type[BaseModel]
+    namespace: Optional[str] = None
+    image_field: Optional[str] = None
+
+IMPORT_TARGETS: Dict[str, ImportTarget] = {
+    "students": ImportTarget("students", StudentCreate, namespace="students", image_field="profile_image_url"),
+    "faculties": ImportTarget("faculties", FacultyCreate, namespace="faculties", image_field="profile_image_url"),
+    "courses": ImportTarget("courses", CourseCreate, namespace="courses"),
+    "classes": ImportTarget("classes", ClassCreate, namespace="classes"),
+}
+
+def _detect_format(upload_file: UploadFile) -> str:
+    extension = os.path.splitext(upload_file.filename or "")[1].lower()
+    if extension == ".csv" or upload_file.content_type == "text/csv":
+        return "csv"
+    if extension in (".ndjson", ".jsonl") or upload_file.content_type in ("application/x-ndjson", "application/jsonl"):
+        return "ndjson"
+    raise HTTPException(status_code=400, detail="Import file must be .csv or .ndjson")
+
+def _iter_rows(upload_file: UploadFile, fmt: str) -> Iterator[Tuple[int, Optional[dict], Optional[str]]]:
+    """Yield (row number, record, parse error) one line at a time from the spooled upload"""
+    upload_file.file.seek(0)
+    text = codecs.getreader("utf-8-sig")(upload_file.file)
+    if fmt == "csv":
+        for row_number, row in enumerate(csv.DictReader(text), start=1):
+            # Blank cells mean "not provided" so optional fields keep their defaults
+            yield row_number, {k: v for k, v in row.items() if k and v not in ("", None)}, None
+        return
+    for row_number, line in enumerate(text, start=1):
+        if not line.strip():
+            continue
+        try:
+            record = json.loads(line)
+        except json.JSONDecodeError as e:
+            yield row_number, None, f"Invalid JSON: {e.msg}"
+            continue
+        if not isinstance(record, dict):
+            yield row_number, None, "Each line must be a JSON object"
+            continue
+        yield row_number, record, None
+
+def _split_list_fields(schema: Type[BaseModel], record: dict) -> dict:
+    for name, field in schema.model_fields.items():
+        if get_origin(field.annotation) is list and isinstance(record.get(name), str):
+            record[name] = [item.strip() for item in record[name].split(LIST_SEPARATOR) if item.strip()]
+    return record
+
+def _validation_messages(error: ValidationError) -> List[str]:
+    return [f"{'.'.join(str(p) for p in e['loc'])}: {e['msg']}" for e in error.errors()]
+
+async def _store_zip_image(db: AsyncDatabase, images: zipfile.ZipFile, name: str) -> str:
+    try:
+        member = images.getinfo(name)
+    except KeyError:
+        raise ValueError(f"{IMAGE_COLUMN}: '{name}' not found in images zip")
+    content_type = mimetypes.guess_type(name)[0] or "application/octet-stream"
+    upload = UploadFile(
+        file=images.open(member),
+        filename=os.path.basename(name),
+        headers=Headers({"content-type": content_type}),
+    )
+    try:
+        return await store_media(db, upload, "image")
+    except HTTPException as e:
+        raise ValueError(f"{IMAGE_COLUMN}: {e.detail}")
+
+class ImportReport:
+    def __init__(self):
+        self.inserted = 0
+        self.failed = 0
+        self.errors: List[Dict[str, Any]] = []
+
+    def fail(self, row: int, messages: List[str]):
+        self.failed += 1
+        if len(self.errors) < MAX_REPORTED_ERRORS:
+            self.errors.append({"row": row, "errors": messages})
+
+    def as_dict(self) -> dict:
+        return {
+            "inserted": self.inserted,
+            "failed": self.failed,
+            "errors": self.errors,
+            "errors_truncated": self.failed > len(self.errors),
+        }
+
+def _parse_batch(
+    rows: Iterator[Tuple[int, Optional[dict], Optional[str]]], target: ImportTarget, report: ImportReport
+) -> Tuple[List[Tuple[int, dict, Optional[str]]], bool]:
+    """Parse and validate the next IMPORT_BATCH_SIZE rows (runs on a worker thread).
+
+    Returns (row number, document, image name) for each valid row, with
+    failures recorded on ``report``, and whether any rows may remain.
+    """
+    parsed = []
+    consumed = 0
+    for row_number, record, parse_error in itertools.islice(rows, IMPORT_BATCH_SIZE):
+        consumed += 1
+        if parse_error:
+            report.fail(row_number, [parse_error])
+            continue
+
+        image_name = record.pop(IMAGE_COLUMN, None)
+        try:
+            document = target.schema(**_split_list_fields(target.schema, record)).model_dump()
+        except ValidationError as e:
+            report.fail(row_number, _validation_messages(e))
+            continue
+        parsed.append((row_number, document, image_name))
+    return parsed, consumed == IMPORT_BATCH_SIZE
+
+async def _flush(db: AsyncDatabase, target: ImportTarget, batch: List[Tuple[int, dict]], report: ImportReport):
+    if not batch:
+        return
+    documents = [document for _, document in batch]
+    try:
+        result = await db[target.collection].insert_many(documents, ordered=False)
+        report.inserted += len(result.inserted_ids)
+    except BulkWriteError as e:
+        failed = {error["index"]: error.get("errmsg", "write failed") for error in e.details.get("writeErrors", [])}
+        report.inserted += e.details.get("nInserted", len(batch) - len(failed))
+        for index, message in failed.items():
+            row_number, document = batch[index]
+            if target.image_field:
+                await release_media(db, document.get(target.image_field))
+            report.fail(row_number, [message])
+
+async def bulk_import(db: AsyncDatabase, target_name: str, upload_file: UploadFile, images: Optional[UploadFile] = None) -> dict:
+    """Validate and insert every row of a CSV/NDJSON upload.
+
+    Rows are parsed and validated a batch of IMPORT_BATCH_SIZE at a time on
+    a worker thread and written with unordered insert_many, so one bad row
+    never blocks the rest. Rows for targets with a profile image may name a
+    file from the optional images zip in a ``profile_image`` column.
+    Returns a per-row error report.
+    """
+    target = IMPORT_TARGETS[target_name]
+    fmt = _detect_format(upload_file)
+
+    images_zip = None
+    if images is not None:
+        if target.image_field is None:
+            raise HTTPException(status_code=400, detail=f"{target_name} rows have no images")
+        try:
+            images_zip = zipfile.ZipFile(images.file)
+        except zipfile.BadZipFile:
+            raise HTTPException(status_code=400, detail="Images must be uploaded as a zip archive")
+
+    report = ImportReport()
+    rows = _iter_rows(upload_file, fmt)
+    try:
+        more = True
+        while more:
+            # Reading, decoding and validating a batch is CPU work; keep it off the event loop
+            parsed, more = await run_in_threadpool(_parse_batch, rows, target, report)
+            batch: List[Tuple[int, dict]] = []
+            for row_number, document, image_name in parsed:
+                if image_name:
+                    if images_zip is None:
+                        report.fail(row_number, [f"{IMAGE_COLUMN}: no images zip was uploaded"])
+                        continue
+                    try:
+                        document[target.image_field] = await _store_zip_image(db, images_zip, image_name)
+                    except ValueError as e:
+                        report.fail(row_number, [str(e)])
+                        continue
+                batch.append((row_number, document))
+            await _flush(db, target, batch, report)
+    except UnicodeDecodeError:
+        raise HTTPException(status_code=400, detail="Import file must be UTF-8 encoded")
+    finally:
+        if images_zip is not None:
+            images_zip.close()
+
+    if report.inserted and target.namespace:
+        await collection_changed(db, target.namespace)
+        mark_stale(target.namespace)
+    return report.as_dict()
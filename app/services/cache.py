@@ -0,0 +1,222 @@
+import json
+import time
+from collections import OrderedDict
+from dataclasses import dataclass, field
+from functools import lru_cache
+from typing import Any, Awaitable, Callable, Dict, List, Optional, get_args
+from fastapi import Request, Response
+from pydantic import TypeAdapter
+from pymongo.asynchronous.database import AsyncDatabase
+from app.config import settings
+from app.services.pagination import Page, page_headers
+
+@dataclass
+class CachedResponse:
+    """A fully serialized response body plus the headers to replay with it"""
+    body: bytes
+    headers: Dict[str, str] = field(default_factory=dict)
+    media_type: str = "application/json"
+
+class MemoryCache:
+    """In-process LRU cache with a per-entry TTL.
+
+    Entries are grouped by namespace so a write to one collection can drop
+    every cached response built from it without touching the others.
+    """
+
+    def __init__(self, max_entries: int = 512, ttl: int = 60):
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self.hits = 0
+        self.misses = 0
+        self._entries: "OrderedDict[str, tuple]" = OrderedDict()
+
+    async def get(self, key: str) -> Optional[Any]:
+        entry = self._entries.get(key)
+        if entry is None or entry[0] < time.monotonic():
+            self.misses += 1
+            return None
+        self._entries.move_to_end(key)
+        self.hits += 1
+        return entry[2]
+
+    async def set(self, key: str, value: Any, namespace: str, ttl: Optional[int] = None):
+        expires_at = time.monotonic() + (ttl if ttl is not None else self.ttl)
+        self._entries[key] = (expires_at, namespace, value)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+
+    async def get_stale(self, key: str) -> Optional[Any]:
+        """The entry even if it has expired, for when it cannot be rebuilt"""
+        entry = self._entries.get(key)
+        return entry[2] if entry is not None else None
+
+    async def invalidate(self, namespace: str):
+        for key in [k for k, entry in self._entries.items() if entry[1] == namespace]:
+            del self._entries[key]
+
+    async def clear(self):
+        self._entries.clear()
+
+class RedisCache:
+    """Redis-backed response cache shared by every worker.
+
+    Each namespace keeps a set of its keys so invalidation deletes exactly
+    the responses built from that collection. Redis being unreachable never
+    fails a request: reads count as misses and writes are logged and dropped.
+    """
+
+    def __init__(self, url: str, ttl: int = 60, prefix: str = "jnani:cache:"):
+        import redis.asyncio as redis
+        from redis.exceptions import RedisError
+
+        self.redis = redis.from_url(url)
+        self.errors = RedisError
+        self.ttl = ttl
+        self.prefix = prefix
+        self.hits = 0
+        self.misses = 0
+
+    async def get(self, key: str) -> Optional[CachedResponse]:
+        try:
+            data = await self.redis.hgetall(self.prefix + key)
+        except self.errors as e:
+            print(f"Response cache read failed: {e}")
+            data = None
+        if not data:
+            self.misses += 1
+            return None
+        self.hits += 1
+        return CachedResponse(
+            body=data[b"body"],
+            headers=json.loads(data[b"headers"]),
+            media_type=data[b"media_type"].decode(),
+        )
+
+    async def get_stale(self, key: str) -> Optional[CachedResponse]:
+        # Redis has already dropped expired entries, so only live ones can be served
+        return await self.get(key)
+
+    async def set(self, key: str, value: CachedResponse, namespace: str, ttl: Optional[int] = None):
+        ttl = ttl if ttl is not None else self.ttl
+        redis_key = self.prefix + key
+        namespace_key = f"{self.prefix}ns:{namespace}"
+        try:
+            async with self.redis.pipeline(transaction=False) as pipe:
+                pipe.hset(redis_key, mapping={
+                    "body": value.body,
+                    "headers": json.dumps(value.headers),
+                    "media_type": value.media_type,
+                })
+                pipe.expire(redis_key, ttl)
+                pipe.sadd(namespace_key, redis_key)
+                pipe.expire(namespace_key, ttl)
+                await pipe.execute()
+        except self.errors as e:
+            print(f"Response cache write failed: {e}")
+
+    async def invalidate(self, namespace: str):
+        namespace_key = f"{self.prefix}ns:{namespace}"
+        try:
+            keys = await self.redis.smembers(namespace_key)
+            await self.redis.delete(namespace_key, *keys)
+        except self.errors as e:
+            # Stale entries are then served until their TTL runs out
+            print(f"Response cache invalidation of {namespace} failed: {e}")
+
+    async def clear(self):
+        try:
+            keys = [key async for key in self.redis.scan_iter(match=self.prefix + "*")]
+            if keys:
+                await self.redis.delete(*keys)
+        except self.errors as e:
+            print(f"Response cache clear failed: {e}")
+
+def build_response_cache():
+    if settings.CACHE_BACKEND == "redis":
+        try:
+            return RedisCache(settings.REDIS_URL, ttl=settings.CACHE_TTL_SECONDS)
+        except ImportError:
+            print("redis package not installed, falling back to in-memory response cache")
+    return MemoryCache(max_entries=settings.CACHE_MAX_ENTRIES, ttl=settings.CACHE_TTL_SECONDS)
+
+response_cache = build_response_cache()
+
+def cache_key(request: Request) -> str:
+    """Key a response by route path and its (order-insensitive) query string"""
+    query = "&".join(f"{k}={v}" for k, v in sorted(request.query_params.multi_items()))
+    return f"{request.url.path}?{query}"
+
+@lru_cache(maxsize=None)
+def _adapter(response_model: Any) -> TypeAdapter:
+    return TypeAdapter(response_model)
+
+def serialize(data: Any, response_model: Any = Any, by_alias: bool = True) -> bytes:
+    """Validate ``data`` against ``response_model`` and dump it to JSON bytes"""
+    adapter = _adapter(response_model)
+    return adapter.dump_json(adapter.validate_python(data), by_alias=by_alias)
+
+async def stale_response(request: Request) -> Optional[Response]:
+    """Replay whatever is cached for this request, expired or not, during a database outage"""
+    if request.method != "GET":
+        return None
+    try:
+        cached = await response_cache.get_stale(cache_key(request))
+    except Exception:
+        return None
+    if cached is None:
+        return None
+    headers = {**cached.headers, "Warning": '110 - "Response is Stale"'}
+    return Response(content=cached.body, media_type=cached.media_type, headers=headers)
+
+async def cached_response(
+    request: Request,
+    db: AsyncDatabase,
+    namespace: str,
+    producer: Callable[[], Awaitable[Any]],
+    response_model: Any = Any,
+    by_alias: bool = True,
+    fields: Optional[List[str]] = None,
+) -> Response:
+    """Serve a read endpoint through the response cache.
+
+    On a hit the stored JSON is replayed as-is, skipping both the database
+    and Pydantic. On a miss the namespace version is read first so a
+    matching If-None-Match / If-Modified-Since returns 304 before the
+    producer runs; otherwise the producer's result is validated and
+    serialized once against ``response_model`` and the bytes are cached
+    along with their ETag. A producer may return a ``Page``, in which case
+    its items are served and the pagination headers are cached with them.
+    With a sparse ``fields`` selection the items of a ``List[Model]``
+    response are cut down to those fields instead of being validated.
+    """
+    from app.services.versioning import get_collection_version, validator_headers, is_not_modified
+
+    key = cache_key(request)
+    cached = await response_cache.get(key)
+    if cached is None:
+        version = await get_collection_version(db, namespace)
+        headers = validator_headers(version)
+        if is_not_modified(request, headers):
+            return Response(status_code=304, headers=headers)
+
+        data = await producer()
+        if isinstance(data, Page):
+            headers = {**headers, **page_headers(request, data)}
+            data = data.items
+        if fields:
+            from app.services.fields import sparse_items
+            data = sparse_items(get_args(response_model)[0], data, fields, by_alias)
+        if isinstance(data, bytes):
+            body = data
+        else:
+            body = serialize(data, List[dict] if fields else response_model, by_alias)
+        cached = CachedResponse(body=body, headers=headers)
+        # Only cache if no write landed while we were building the body,
+        # otherwise the stored ETag would describe older data
+        if (await get_collection_version(db, namespace))["version"] == version["version"]:
+            await response_cache.set(key, cached, namespace)
+    elif is_not_modified(request, cached.headers):
+        return Response(status_code=304, headers=cached.headers)
+    return Response(content=cached.body, media_type=cached.media_type, headers=cached.headers)
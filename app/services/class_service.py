@@ -1,25 +1,32 @@
-from pymongo.database import Database
-from app.schemas.class_schema import ClassCreate, ClassUpdate
+from typing import List, Optional
+from pymongo.asynchronous.database import AsyncDatabase
+from app.schemas.class_schema import Class, ClassCreate, ClassUpdate
+from app.services.versioning import collection_changed
+from app.services.pagination import Page, PageParams, paginate
+from app.services.fields import projection_for
 from bson import ObjectId
 
-def get_all_classes(db: Database):
-    classes = list(db.classes.find())
-    for class_item in classes:
+async def get_all_classes(db: AsyncDatabase, params: Optional[PageParams] = None, fields: Optional[List[str]] = None) -> Page:
+    page = await paginate(db.classes, params=params, projection=projection_for(Class, fields))
+    for class_item in page.items:
         class_item["id"] = str(class_item["_id"])
-    return classes
+    return page
 
-def create_new_class(db: Database, class_data: ClassCreate):
+async def create_new_class(db: AsyncDatabase, class_data: ClassCreate):
     class_dict = class_data.dict()
-    result = db.classes.insert_one(class_dict)
+    result = await db.classes.insert_one(class_dict)
+    await collection_changed(db, "classes")
     return str(result.inserted_id)
 
-def update_class_by_id(db: Database, class_id: str, class_data: ClassUpdate):
+async def update_class_by_id(db: AsyncDatabase, class_id: str, class_data: ClassUpdate):
     class_dict = class_data.dict(exclude_unset=True)
-    result = db.classes.update_one(
+    result = await db.classes.update_one(
         {"_id": ObjectId(class_id)}, {"$set": class_dict}
     )
+    await collection_changed(db, "classes")
     return result.modified_count > 0
 
-def delete_class_by_id(db: Database, class_id: str):
-    result = db.classes.delete_one({"_id": ObjectId(class_id)})
+async def delete_class_by_id(db: AsyncDatabase, class_id: str):
+    result = await db.classes.delete_one({"_id": ObjectId(class_id)})
+    await collection_changed(db, "classes")
     return result.deleted_count > 0 
\ No newline at end of file
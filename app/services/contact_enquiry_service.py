@@ -1,55 +1,105 @@
 from typing import List, Optional
-from pymongo.database import Database
+from pymongo import DESCENDING
+from pymongo.asynchronous.cursor import AsyncCursor
+from pymongo.asynchronous.database import AsyncDatabase
 from bson import ObjectId
 from datetime import datetime
-from app.schemas.contact_enquiry import ContactEnquiryCreate, ContactEnquiryUpdate
+from app.schemas.contact_enquiry import ContactEnquiry, ContactEnquiryCreate, ContactEnquiryUpdate
+from app.services.pagination import Page, PageParams, paginate
+from app.services.fields import projection_for
+from app.services.search_service import search_page
 
-def create_contact_enquiry(db: Database, enquiry_data: ContactEnquiryCreate) -> str:
+# List views show a preview; the full message comes from get_contact_enquiry_by_id
+MESSAGE_PREVIEW_LENGTH = 200
+
+async def create_contact_enquiry(db: AsyncDatabase, enquiry_data: ContactEnquiryCreate) -> str:
     """Create a new contact enquiry"""
     enquiry_dict = enquiry_data.model_dump()
     enquiry_dict["status"] = "pending"
     enquiry_dict["created_at"] = datetime.utcnow()
     enquiry_dict["updated_at"] = datetime.utcnow()
     
-    result = db.contact_enquiries.insert_one(enquiry_dict)
+    result = await db.contact_enquiries.insert_one(enquiry_dict)
     return str(result.inserted_id)
 
-def get_all_contact_enquiries(db: Database, skip: int = 0, limit: int = 100) -> List[dict]:
-    """Get all contact enquiries with pagination"""
-    enquiries = list(db.contact_enquiries.find().sort("created_at", -1).skip(skip).limit(limit))
+async def get_all_contact_enquiries(
+    db: AsyncDatabase,
+    params: Optional[PageParams] = None,
+    skip: int = 0,
+    fields: Optional[List[str]] = None,
+    q: Optional[str] = None
+) -> Page:
+    """Get contact enquiries, newest first (or best match first for ``q``), one page at a time"""
+    projection = projection_for(
+        ContactEnquiry,
+        fields,
+        overrides={"message": {"$substrCP": ["$message", 0, MESSAGE_PREVIEW_LENGTH]}}
+    )
+    if q:
+        page = await search_page(db.contact_enquiries, q, params, projection)
+    else:
+        page = await paginate(
+            db.contact_enquiries,
+            params=params,
+            projection=projection,
+            sort_key="created_at",
+            direction=DESCENDING,
+            skip=skip
+        )
     
-    for enquiry in enquiries:
+    for enquiry in page.items:
         enquiry["id"] = str(enquiry["_id"])
     
-    return enquiries
+    return page
+
+ENQUIRY_EXPORT_FIELDS = ["_id", "name", "email", "phone", "message", "status", "admin_notes", "created_at", "updated_at"]
+
+def export_contact_enquiries(
+    db: AsyncDatabase,
+    status: Optional[str] = None,
+    created_from: Optional[datetime] = None,
+    created_to: Optional[datetime] = None
+) -> AsyncCursor:
+    """Cursor over the enquiries to export, newest first, projected to the exported fields"""
+    query = {}
+    if status:
+        query["status"] = status
+    if created_from or created_to:
+        query["created_at"] = {}
+        if created_from:
+            query["created_at"]["$gte"] = created_from
+        if created_to:
+            query["created_at"]["$lt"] = created_to
+    projection = {field: 1 for field in ENQUIRY_EXPORT_FIELDS}
+    return db.contact_enquiries.find(query, projection).sort([("created_at", DESCENDING), ("_id", DESCENDING)])
 
-def get_contact_enquiry_by_id(db: Database, enquiry_id: str) -> Optional[dict]:
+async def get_contact_enquiry_by_id(db: AsyncDatabase, enquiry_id: str) -> Optional[dict]:
     """Get contact enquiry by ID"""
-    enquiry = db.contact_enquiries.find_one({"_id": ObjectId(enquiry_id)})
+    enquiry = await db.contact_enquiries.find_one({"_id": ObjectId(enquiry_id)})
     
     if enquiry:
         enquiry["id"] = str(enquiry["_id"])
     
     return enquiry
 
-def update_contact_enquiry(db: Database, enquiry_id: str, update_data: ContactEnquiryUpdate) -> bool:
+async def update_contact_enquiry(db: AsyncDatabase, enquiry_id: str, update_data: ContactEnquiryUpdate) -> bool:
     """Update contact enquiry status and notes"""
     update_dict = update_data.model_dump(exclude_unset=True)
     update_dict["updated_at"] = datetime.utcnow()
     
-    result = db.contact_enquiries.update_one(
+    result = await db.contact_enquiries.update_one(
         {"_id": ObjectId(enquiry_id)},
         {"$set": update_dict}
     )
     
     return result.modified_count > 0
 
-def delete_contact_enquiry(db: Database, enquiry_id: str) -> bool:
+async def delete_contact_enquiry(db: AsyncDatabase, enquiry_id: str) -> bool:
     """Delete contact enquiry"""
-    result = db.contact_enquiries.delete_one({"_id": ObjectId(enquiry_id)})
+    result = await db.contact_enquiries.delete_one({"_id": ObjectId(enquiry_id)})
     return result.deleted_count > 0
 
-def get_contact_enquiries_count(db: Database) -> dict:
+async def get_contact_enquiries_count(db: AsyncDatabase) -> dict:
     """Get count of enquiries by status"""
     pipeline = [
         {
@@ -60,7 +110,7 @@ def get_contact_enquiries_count(db: Database) -> dict:
         }
     ]
     
-    results = list(db.contact_enquiries.aggregate(pipeline))
+    results = await (await db.contact_enquiries.aggregate(pipeline)).to_list()
     counts = {"total": 0, "pending": 0, "read": 0, "replied": 0, "closed": 0}
     
     for result in results:
@@ -1,9 +1,10 @@
-from pymongo.database import Database
+from pymongo.asynchronous.database import AsyncDatabase
 from app.schemas.content import ContentCreate
+from app.services.versioning import collection_changed
 from bson import ObjectId
 
-def get_all_content(db: Database):
-    content_list = list(db.content.find())
+async def get_all_content(db: AsyncDatabase):
+    content_list = await db.content.find().to_list()
     
     # Transform the content into the desired format
     structured_content = {
@@ -48,29 +49,31 @@ def get_all_content(db: Database):
     # print("Structured content:", structured_content)
     return structured_content
 
-def get_content_by_type(db: Database, content_type: str):
-    content = db.content.find_one({"type": content_type})
+async def get_content_by_type(db: AsyncDatabase, content_type: str):
+    content = await db.content.find_one({"type": content_type})
     if content:
         content["id"] = str(content["_id"])
     return content
 
-def create_new_content(db: Database, content):
+async def create_new_content(db: AsyncDatabase, content):
     # Handle both Pydantic models and dictionaries
     if hasattr(content, 'model_dump'):
         content_dict = content.model_dump()
     else:
         content_dict = content
     
-    result = db.content.insert_one(content_dict)
+    result = await db.content.insert_one(content_dict)
+    await collection_changed(db, "content")
     return str(result.inserted_id)
 
-def update_content_by_id(db: Database, content_id: str, content: ContentCreate):
-    result = db.content.update_one(
+async def update_content_by_id(db: AsyncDatabase, content_id: str, content: ContentCreate):
+    result = await db.content.update_one(
         {"_id": ObjectId(content_id)}, {"$set": content.model_dump()}
     )
+    await collection_changed(db, "content")
     return result.modified_count > 0
 
-def update_content_by_type(db: Database, content_type: str, content_data: dict):
+async def update_content_by_type(db: AsyncDatabase, content_type: str, content_data: dict):
     print("Updating content for type:", content_type)
     print("Content data:", content_data)
     
@@ -78,25 +81,28 @@ def update_content_by_type(db: Database, content_type: str, content_data: dict):
     content_data = {k: v for k, v in content_data.items() if v is not None}
     
     # Check if the document exists
-    existing_doc = db.content.find_one({"type": content_type})
+    existing_doc = await db.content.find_one({"type": content_type})
     print("Existing document:", existing_doc)
     
     if existing_doc:
         # Update existing document
-        result = db.content.update_one(
+        result = await db.content.update_one(
             {"type": content_type}, 
             {"$set": content_data}
         )
         print("Update result:", result.modified_count)
+        await collection_changed(db, "content")
         # Return True if update was successful (even if no changes were made)
         return True
     else:
         # Create new document
         content_data["type"] = content_type
-        result = db.content.insert_one(content_data)
+        result = await db.content.insert_one(content_data)
         print("Insert result:", result.inserted_id)
+        await collection_changed(db, "content")
         return result.inserted_id is not None
 
-def delete_content_by_id(db: Database, content_id: str):
-    result = db.content.delete_one({"_id": ObjectId(content_id)})
+async def delete_content_by_id(db: AsyncDatabase, content_id: str):
+    result = await db.content.delete_one({"_id": ObjectId(content_id)})
+    await collection_changed(db, "content")
     return result.deleted_count > 0 
\ No newline at end of file
@@ -1,23 +1,40 @@
-from pymongo.database import Database
-from app.schemas.course import CourseCreate
+from typing import List, Optional
+from pymongo.asynchronous.database import AsyncDatabase
+from app.schemas.course import Course, CourseCreate
+from app.services.versioning import collection_changed
+from app.services.pagination import Page, PageParams, paginate
+from app.services.fields import projection_for
+from app.services.search_service import search_page
 from bson import ObjectId
 
-def get_all_courses(db: Database):
-    courses = list(db.courses.find())
-    for course in courses:
+async def get_all_courses(
+    db: AsyncDatabase,
+    params: Optional[PageParams] = None,
+    fields: Optional[List[str]] = None,
+    q: Optional[str] = None
+) -> Page:
+    projection = projection_for(Course, fields)
+    if q:
+        page = await search_page(db.courses, q, params, projection)
+    else:
+        page = await paginate(db.courses, params=params, projection=projection)
+    for course in page.items:
         course["id"] = str(course["_id"])
-    return courses
+    return page
 
-def create_new_course(db: Database, course: CourseCreate):
-    result = db.courses.insert_one(course.dict())
+async def create_new_course(db: AsyncDatabase, course: CourseCreate):
+    result = await db.courses.insert_one(course.dict())
+    await collection_changed(db, "courses")
     return str(result.inserted_id)
 
-def update_course_by_id(db: Database, course_id: str, course: CourseCreate):
-    result = db.courses.update_one(
+async def update_course_by_id(db: AsyncDatabase, course_id: str, course: CourseCreate):
+    result = await db.courses.update_one(
         {"_id": ObjectId(course_id)}, {"$set": course.dict()}
     )
+    await collection_changed(db, "courses")
     return result.modified_count > 0
 
-def delete_course_by_id(db: Database, course_id: str):
-    result = db.courses.delete_one({"_id": ObjectId(course_id)})
+async def delete_course_by_id(db: AsyncDatabase, course_id: str):
+    result = await db.courses.delete_one({"_id": ObjectId(course_id)})
+    await collection_changed(db, "courses")
     return result.deleted_count > 0 
\ No newline at end of file
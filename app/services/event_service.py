@@ -1,24 +1,62 @@
-from pymongo.database import Database
-from app.schemas.event import EventCreate, EventUpdate
+from pymongo.asynchronous.database import AsyncDatabase
+from app.schemas.event import Event, EventCreate, EventUpdate
 from bson import ObjectId
+from datetime import datetime
+from pymongo import ASCENDING, DESCENDING
 from fastapi import UploadFile
-import shutil
-import os
-from typing import Optional
+from typing import List, Optional
 from app.config import settings
+from app.services.versioning import collection_changed
+from app.services.pagination import Page, PageParams, paginate
+from app.services.fields import projection_for
+from app.services.search_service import search_page
+from app.services.media_store import store_media, release_media
 
-MEDIA_DIR = "media"
+async def get_all_events(
+    db: AsyncDatabase,
+    params: Optional[PageParams] = None,
+    fields: Optional[List[str]] = None,
+    q: Optional[str] = None
+) -> Page:
+    projection = projection_for(Event, fields)
+    if q:
+        page = await search_page(db.events, q, params, projection)
+    else:
+        page = await paginate(db.events, params=params, projection=projection)
+    for event in page.items:
+        event["id"] = str(event["_id"])
+        if event.get("image_url"):
+            event["image_url"] = f"{settings.MEDIA_URL}{event['image_url']}"
+        if event.get("video_url"):
+            event["video_url"] = f"{settings.MEDIA_URL}{event['video_url']}"
+    return page
+
+# Events without an is_active flag count as active
+ACTIVE_EVENTS = {"is_active": {"$in": [True, None]}}
+CAROUSEL_LIMIT = 10
+SECTION_LIMIT = 20
+MISSING = [None, ""]
+
+def active_event_query(has_image: Optional[bool] = None, has_video: Optional[bool] = None, when: Optional[str] = None) -> dict:
+    """Filter for active events, optionally by media presence and upcoming/past window"""
+    query = dict(ACTIVE_EVENTS)
+    if has_image is not None:
+        query["image_url"] = {"$nin": MISSING} if has_image else {"$in": MISSING}
+    if has_video is not None:
+        query["video_url"] = {"$nin": MISSING} if has_video else {"$in": MISSING}
+    if when == "upcoming":
+        query["event_date"] = {"$gte": datetime.utcnow()}
+    elif when == "past":
+        query["event_date"] = {"$lt": datetime.utcnow()}
+    return query
 
-def save_upload_file(upload_file: UploadFile, destination: str) -> str:
-    try:
-        with open(destination, "wb") as buffer:
-            shutil.copyfileobj(upload_file.file, buffer)
-    finally:
-        upload_file.file.close()
-    return destination
+async def find_active_events(db: AsyncDatabase, query: dict, projection: dict, limit: int, when: Optional[str] = None) -> List[dict]:
+    """At most ``limit`` matching events, served from the (is_active, event_date) index.
 
-def get_all_events(db: Database):
-    events = list(db.events.find())
+    Upcoming events come soonest first; otherwise the most recent come first.
+    """
+    direction = ASCENDING if when == "upcoming" else DESCENDING
+    events = await db.events.find(query, projection).sort("event_date", direction).limit(limit).to_list()
     for event in events:
         event["id"] = str(event["_id"])
         if event.get("image_url"):
@@ -27,63 +65,94 @@ def get_all_events(db: Database):
             event["video_url"] = f"{settings.MEDIA_URL}{event['video_url']}"
     return events
 
-def create_new_event(db: Database, event: EventCreate, image: Optional[UploadFile] = None, video: Optional[UploadFile] = None):
+async def get_carousel_items(db: AsyncDatabase, limit: int = CAROUSEL_LIMIT, when: Optional[str] = None) -> List[dict]:
+    """Active events that have an image, for the homepage carousel"""
+    query = active_event_query(has_image=True, when=when)
+    projection = {"title": 1, "description": 1, "image_url": 1}
+    events = await find_active_events(db, query, projection, limit, when)
+    return [
+        {
+            "id": event["id"],
+            "title": event.get("title"),
+            "description": event.get("description"),
+            "image_url": event.get("image_url")
+        }
+        for event in events
+    ]
+
+async def get_section_events(
+    db: AsyncDatabase,
+    limit: int = SECTION_LIMIT,
+    when: Optional[str] = None,
+    has_video: Optional[bool] = None
+) -> List[dict]:
+    """Active events with their video stream links, for the events section"""
+    query = active_event_query(has_video=has_video, when=when)
+    projection = {"title": 1, "description": 1, "event_date": 1, "image_url": 1, "video_url": 1}
+    events = await find_active_events(db, query, projection, limit, when)
+    return [
+        {
+            "id": event["id"],
+            "title": event.get("title"),
+            "description": event.get("description"),
+            "event_date": event.get("event_date"),
+            "image_url": event.get("image_url"),
+            "video_url": event.get("video_url"),
+            "video_stream_url": f"{settings.MEDIA_URL}/events/{event['id']}/video" if event.get("video_url") else None
+        }
+        for event in events
+    ]
+
+async def create_new_event(db: AsyncDatabase, event: EventCreate, image: Optional[UploadFile] = None, video: Optional[UploadFile] = None):
     event_dict = event.dict()
     
     if image:
-        image_location = os.path.join(MEDIA_DIR, image.filename)
-        save_upload_file(image, image_location)
-        event_dict["image_url"] = f"/media/{image.filename}"
+        event_dict["image_url"] = await store_media(db, image, "image")
     
     if video:
-        video_location = os.path.join(MEDIA_DIR, video.filename)
-        save_upload_file(video, video_location)
-        event_dict["video_url"] = f"/media/{video.filename}"
+        event_dict["video_url"] = await store_media(db, video, "video")
 
-    result = db.events.insert_one(event_dict)
+    result = await db.events.insert_one(event_dict)
+    await collection_changed(db, "events")
     return str(result.inserted_id)
 
-def update_event_by_id(db: Database, event_id: str, event: EventUpdate, image: Optional[UploadFile] = None, video: Optional[UploadFile] = None):
+async def update_event_by_id(db: AsyncDatabase, event_id: str, event: EventUpdate, image: Optional[UploadFile] = None, video: Optional[UploadFile] = None):
     event_dict = event.dict(exclude_unset=True)
     
-    old_event = db.events.find_one({"_id": ObjectId(event_id)})
+    old_event = await db.events.find_one({"_id": ObjectId(event_id)})
+    if not old_event:
+        # Before storing uploads, whose blob references nothing would release
+        return False
 
     if image:
-        if old_event and old_event.get("image_url"):
-            old_image_path = old_event["image_url"].replace("/media/", f"{MEDIA_DIR}/", 1)
-            if os.path.exists(old_image_path):
-                os.remove(old_image_path)
-        
-        image_location = os.path.join(MEDIA_DIR, image.filename)
-        save_upload_file(image, image_location)
-        event_dict["image_url"] = f"/media/{image.filename}"
+        event_dict["image_url"] = await store_media(db, image, "image")
+        await release_media(db, old_event.get("image_url"))
 
     if video:
-        if old_event and old_event.get("video_url"):
-            old_video_path = old_event["video_url"].replace("/media/", f"{MEDIA_DIR}/", 1)
-            if os.path.exists(old_video_path):
-                os.remove(old_video_path)
-
-        video_location = os.path.join(MEDIA_DIR, video.filename)
-        save_upload_file(video, video_location)
-        event_dict["video_url"] = f"/media/{video.filename}"
+        event_dict["video_url"] = await store_media(db, video, "video")
+        await release_media(db, old_event.get("video_url"))
     
-    result = db.events.update_one(
+    result = await db.events.update_one(
         {"_id": ObjectId(event_id)}, {"$set": event_dict}
     )
+    await collection_changed(db, "events")
     return result.modified_count > 0
 
-def delete_event_by_id(db: Database, event_id: str):
-    event = db.events.find_one({"_id": ObjectId(event_id)})
+async def delete_event_by_id(db: AsyncDatabase, event_id: str):
+    event = await db.events.find_one({"_id": ObjectId(event_id)})
     if event:
-        if event.get("image_url"):
-            image_path = event["image_url"].replace("/media/", f"{MEDIA_DIR}/", 1)
-            if os.path.exists(image_path):
-                os.remove(image_path)
-        if event.get("video_url"):
-            video_path = event["video_url"].replace("/media/", f"{MEDIA_DIR}/", 1)
-            if os.path.exists(video_path):
-                os.remove(video_path)
+        await release_media(db, event.get("image_url"))
+        await release_media(db, event.get("video_url"))
             
-    result = db.events.delete_one({"_id": ObjectId(event_id)})
-    return result.deleted_count > 0 
\ No newline at end of file
+    result = await db.events.delete_one({"_id": ObjectId(event_id)})
+    await collection_changed(db, "events")
+    return result.deleted_count > 0
+
+async def get_event_video_path(db: AsyncDatabase, event_id: str) -> Optional[str]:
+    """On-disk path of an event's video, or None if the event has none"""
+    if not ObjectId.is_valid(event_id):
+        return None
+    event = await db.events.find_one({"_id": ObjectId(event_id)}, {"video_url": 1})
+    if not event or not event.get("video_url"):
+        return None
+    return event["video_url"].lstrip("/")
@@ -0,0 +1,73 @@
+import csv
+import io
+import json
+from datetime import datetime
+from typing import AsyncIterator, List
+from bson import ObjectId
+from fastapi.responses import StreamingResponse
+from pymongo.asynchronous.cursor import AsyncCursor
+
+EXPORT_MEDIA_TYPES = {
+    "csv": "text/csv; charset=utf-8",
+    "ndjson": "application/x-ndjson",
+}
+EXPORT_BATCH_SIZE = 1000
+# Rows are buffered into chunks of roughly this size before being sent
+FLUSH_BYTES = 64 * 1024
+# Leading characters spreadsheet apps treat as a formula
+FORMULA_PREFIXES = ("=", "+", "-", "@", "\t", "\r")
+
+def _plain(value):
+    if isinstance(value, ObjectId):
+        return str(value)
+    if isinstance(value, datetime):
+        return value.isoformat()
+    return value
+
+def _csv_cell(value) -> str:
+    value = _plain(value)
+    if value is None:
+        return ""
+    if isinstance(value, (int, float)):
+        # Numbers are never formulas, and negative ones should stay numeric
+        return str(value)
+    if isinstance(value, list):
+        value = ";".join(str(_plain(item)) for item in value)
+    value = str(value)
+    # Public form input ends up here, so never let a cell run as a formula
+    if value.startswith(FORMULA_PREFIXES):
+        value = "'" + value
+    return value
+
+def _column(field: str) -> str:
+    return "id" if field == "_id" else field
+
+async def stream_rows(cursor: AsyncCursor, fields: List[str], fmt: str) -> AsyncIterator[bytes]:
+    """Encode documents from ``cursor`` as CSV or NDJSON, one small chunk at a time"""
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    if fmt == "csv":
+        writer.writerow([_column(field) for field in fields])
+
+    async for document in cursor.batch_size(EXPORT_BATCH_SIZE):
+        if fmt == "csv":
+            writer.writerow([_csv_cell(document.get(field)) for field in fields])
+        else:
+            row = {_column(field): _plain(document.get(field)) for field in fields}
+            buffer.write(json.dumps(row, default=str, ensure_ascii=False))
+            buffer.write("\n")
+        if buffer.tell() >= FLUSH_BYTES:
+            yield buffer.getvalue().encode()
+            buffer.seek(0)
+            buffer.truncate()
+
+    if buffer.tell():
+        yield buffer.getvalue().encode()
+
+def export_response(cursor: AsyncCursor, fields: List[str], fmt: str, filename: str) -> StreamingResponse:
+    """Stream ``cursor`` as a downloadable file without materializing it"""
+    return StreamingResponse(
+        stream_rows(cursor, fields, fmt),
+        media_type=EXPORT_MEDIA_TYPES[fmt],
+        headers={"Content-Disposition": f'attachment; filename="{filename}.{fmt}"'},
+    )
@@ -1,97 +1,61 @@
-from pymongo.database import Database
-from app.schemas.faculty import FacultyCreate
+from pymongo.asynchronous.database import AsyncDatabase
+from app.schemas.faculty import Faculty, FacultyCreate
 from bson import ObjectId
 from fastapi import UploadFile
-import shutil
-import os
-import uuid
-from typing import Optional
-from datetime import datetime
+from typing import List, Optional
 from app.config import settings
-
-MEDIA_DIR = "media"
-FACULTY_IMAGES_DIR = os.path.join(MEDIA_DIR, "faculty")
-
-# Ensure media directories exist
-os.makedirs(MEDIA_DIR, exist_ok=True)
-os.makedirs(FACULTY_IMAGES_DIR, exist_ok=True)
-
-def save_upload_file(upload_file: UploadFile, destination: str) -> str:
-    try:
-        with open(destination, "wb") as buffer:
-            shutil.copyfileobj(upload_file.file, buffer)
-    finally:
-        upload_file.file.close()
-    return destination
-
-def generate_unique_filename(original_filename: str) -> str:
-    """Generate a unique filename to prevent conflicts"""
-    # Get file extension
-    file_extension = os.path.splitext(original_filename)[1]
-    # Generate unique name with timestamp
-    unique_name = f"{uuid.uuid4()}_{int(datetime.utcnow().timestamp())}{file_extension}"
-    return unique_name
-
-def get_all_faculties(db: Database):
-    faculties = list(db.faculties.find())
-    for faculty in faculties:
+from app.services.pagination import Page, PageParams, paginate
+from app.services.fields import projection_for
+from app.services.media_store import store_media, release_media
+from app.services.versioning import collection_changed
+from app.services.typeahead import faculty_typeahead
+
+async def get_all_faculties(db: AsyncDatabase, params: Optional[PageParams] = None, fields: Optional[List[str]] = None) -> Page:
+    page = await paginate(db.faculties, params=params, projection=projection_for(Faculty, fields))
+    for faculty in page.items:
         faculty["id"] = str(faculty["_id"])
         # Remove hardcoded localhost URL - let the frontend handle the base URL
         if faculty.get("profile_image_url"):
             # Keep the relative path as is
             faculty["profile_image_url"] = f"{settings.MEDIA_URL}{faculty['profile_image_url']}"
             
-    return faculties
+    return page
 
-def create_new_faculty(db: Database, faculty: FacultyCreate, profile_image: Optional[UploadFile] = None):
+async def create_new_faculty(db: AsyncDatabase, faculty: FacultyCreate, profile_image: Optional[UploadFile] = None):
     faculty_dict = faculty.dict()
     
     if profile_image:
-        # Generate unique filename
-        unique_filename = generate_unique_filename(profile_image.filename)
-        file_location = os.path.join(FACULTY_IMAGES_DIR, unique_filename)
-        
-        # Save the file
-        save_upload_file(profile_image, file_location)
-        
-        # Store the relative path for web access
-        faculty_dict["profile_image_url"] = f"/media/faculty/{unique_filename}"
+        # Stored by content hash, so the path is unique per image
+        faculty_dict["profile_image_url"] = await store_media(db, profile_image, "image")
 
-    result = db.faculties.insert_one(faculty_dict)
+    result = await db.faculties.insert_one(faculty_dict)
+    faculty_typeahead.written(await collection_changed(db, "faculties"), str(result.inserted_id), faculty_dict)
     return str(result.inserted_id)
 
-def update_faculty_by_id(db: Database, faculty_id: str, faculty: FacultyCreate, profile_image: Optional[UploadFile] = None):
+async def update_faculty_by_id(db: AsyncDatabase, faculty_id: str, faculty: FacultyCreate, profile_image: Optional[UploadFile] = None):
     faculty_dict = faculty.dict(exclude_unset=True)
 
     if profile_image:
-        # Delete the old image before saving the new one
-        old_faculty = db.faculties.find_one({"_id": ObjectId(faculty_id)})
-        if old_faculty and old_faculty.get("profile_image_url"):
-            # Construct file system path from web path
-            old_image_path = old_faculty["profile_image_url"].replace("/media/", f"{MEDIA_DIR}/", 1)
-            if os.path.exists(old_image_path):
-                os.remove(old_image_path)
-
-        # Generate unique filename for new image
-        unique_filename = generate_unique_filename(profile_image.filename)
-        file_location = os.path.join(FACULTY_IMAGES_DIR, unique_filename)
-        
-        # Save the new file
-        save_upload_file(profile_image, file_location)
-        faculty_dict["profile_image_url"] = f"/media/faculty/{unique_filename}"
+        # Release the old image once the new one is stored
+        old_faculty = await db.faculties.find_one({"_id": ObjectId(faculty_id)})
+        if not old_faculty:
+            return False
+        faculty_dict["profile_image_url"] = await store_media(db, profile_image, "image")
+        await release_media(db, old_faculty.get("profile_image_url"))
     
-    result = db.faculties.update_one(
+    result = await db.faculties.update_one(
         {"_id": ObjectId(faculty_id)}, {"$set": faculty_dict}
     )
+    version = await collection_changed(db, "faculties")
+    faculty_typeahead.written(version, faculty_id, await db.faculties.find_one({"_id": ObjectId(faculty_id)}))
     return result.modified_count > 0
 
-def delete_faculty_by_id(db: Database, faculty_id: str):
-    # Also delete the associated image file
-    faculty = db.faculties.find_one({"_id": ObjectId(faculty_id)})
-    if faculty and faculty.get("profile_image_url"):
-        image_path = faculty["profile_image_url"].replace("/media/", f"{MEDIA_DIR}/", 1)
-        if os.path.exists(image_path):
-            os.remove(image_path)
+async def delete_faculty_by_id(db: AsyncDatabase, faculty_id: str):
+    # Also release the associated image file
+    faculty = await db.faculties.find_one({"_id": ObjectId(faculty_id)})
+    if faculty:
+        await release_media(db, faculty.get("profile_image_url"))
             
-    result = db.faculties.delete_one({"_id": ObjectId(faculty_id)})
+    result = await db.faculties.delete_one({"_id": ObjectId(faculty_id)})
+    faculty_typeahead.written(await collection_changed(db, "faculties"), faculty_id, None)
     return result.deleted_count > 0 
\ No newline at end of file
@@ -0,0 +1,73 @@
+from typing import Any, Dict, Iterable, List, Optional, Tuple, Type
+from bson import ObjectId
+from fastapi import HTTPException, Query
+from fastapi.encoders import jsonable_encoder
+from pydantic import BaseModel
+
+def field_params(
+    fields: Optional[str] = Query(None, description="Comma-separated fields to return, e.g. fields=id,name"),
+) -> Optional[List[str]]:
+    if not fields:
+        return None
+    return [name.strip() for name in fields.split(",") if name.strip()] or None
+
+def _field_keys(model: Type[BaseModel]) -> Dict[str, Tuple[str, str, str, Optional[str]]]:
+    """Map each field name and alias to (stored key, key on the service's dict, name, alias).
+
+    Services copy ``_id`` into ``id`` for models without an alias, so an
+    ``id`` field is always stored as ``_id``.
+    """
+    keys = {}
+    for name, info in model.model_fields.items():
+        item_key = info.alias or name
+        stored_key = "_id" if name == "id" else item_key
+        keys[name] = (stored_key, item_key, name, info.alias)
+        if info.alias:
+            keys[info.alias] = keys[name]
+    return keys
+
+def projection_for(
+    model: Type[BaseModel],
+    fields: Optional[List[str]] = None,
+    extra: Iterable[str] = (),
+    overrides: Optional[Dict[str, Any]] = None,
+) -> Dict[str, Any]:
+    """Mongo projection for a list endpoint.
+
+    By default only the fields ``model`` declares are fetched (plus
+    ``extra`` ones the service itself needs), with ``overrides`` swapping
+    in cheaper expressions such as truncated text. With ``fields`` only
+    those are fetched, in full; unknown names are rejected with 400.
+    """
+    keys = _field_keys(model)
+    if fields is None:
+        projection = {stored_key: 1 for stored_key, _, _, _ in keys.values()}
+        projection.update({field: 1 for field in extra})
+        projection.update(overrides or {})
+        return projection
+
+    unknown = [field for field in fields if field not in keys]
+    if unknown:
+        raise HTTPException(status_code=400, detail=f"Unknown field(s): {', '.join(unknown)}")
+    projection = {keys[field][0]: 1 for field in fields}
+    projection.update({field: 1 for field in extra})
+    return projection
+
+def sparse_items(model: Type[BaseModel], items: List[dict], fields: List[str], by_alias: bool = True) -> List[dict]:
+    """Reduce service output to the requested fields, named as the full response would name them.
+
+    Sparse rows skip response-model validation entirely; the id is always
+    kept so rows stay addressable.
+    """
+    keys = _field_keys(model)
+    selected = [keys[field] for field in fields]
+    if "id" in keys and keys["id"] not in selected:
+        selected.insert(0, keys["id"])
+
+    rows = []
+    for item in items:
+        row = {}
+        for _, item_key, name, alias in selected:
+            row[alias if by_alias and alias else name] = item.get(item_key)
+        rows.append(row)
+    return jsonable_encoder(rows, custom_encoder={ObjectId: str})
@@ -1,73 +1,75 @@
 import os
-import shutil
 from datetime import datetime
 from typing import List, Optional
-from pymongo.database import Database
+from pymongo.asynchronous.database import AsyncDatabase
 from bson import ObjectId
 from app.schemas.gallery import AlbumCreate, AlbumUpdate, ImageCreate, Album, AlbumWithImages
-import uuid
+from app.services.versioning import collection_changed
+from app.services.media_store import store_blob, release_media
+from app.services.image_variants import schedule_image_variants
 
-def create_album(db: Database, album: AlbumCreate) -> str:
+async def create_album(db: AsyncDatabase, album: AlbumCreate) -> str:
     """Create a new album"""
     album_data = album.model_dump()
     album_data["created_at"] = datetime.utcnow()
     album_data["updated_at"] = datetime.utcnow()
+    album_data["image_count"] = 0
+    album_data["cover_image"] = None
     
-    result = db.albums.insert_one(album_data)
+    result = await db.albums.insert_one(album_data)
+    await collection_changed(db, "gallery")
     return str(result.inserted_id)
 
-def get_all_albums(db: Database) -> List[Album]:
+async def refresh_album_summary(db: AsyncDatabase, album_id: str) -> dict:
+    """Recompute the denormalized image_count and cover_image of an album.
+
+    Both lookups are served by the images (album_id, created_at) index, so
+    this touches only the album's own images.
+    """
+    image_count = await db.images.count_documents({"album_id": album_id})
+    cover = await db.images.find_one({"album_id": album_id}, sort=[("created_at", 1)])
+    summary = {
+        "image_count": image_count,
+        "cover_image": {
+            "id": str(cover["_id"]),
+            "file_path": cover["file_path"],
+            "variants": cover.get("variants", []),
+            "alt_text": cover.get("alt_text"),
+            "created_at": cover["created_at"],
+        } if cover else None,
+    }
+    await db.albums.update_one({"_id": ObjectId(album_id)}, {"$set": summary})
+    return summary
+
+async def get_all_albums(db: AsyncDatabase) -> List[Album]:
     """Get all albums with image count and first image"""
     if db is None:
         print("Database connection is None")
         return []
     
-    try:
-        pipeline = [
-            {
-                "$lookup": {
-                    "from": "images",
-                    "localField": "_id",
-                    "foreignField": "album_id",
-                    "as": "images"
-                }
-            },
-            {
-                "$addFields": {
-                    "id": { "$toString": "$_id" },
-                    "image_count": { "$size": "$images" },
-                    "first_image": { "$arrayElemAt": ["$images", 0] }
-                }
-            }
-        ]
-        
-        albums_cursor = db.albums.aggregate(pipeline)
-        
-        albums_list = []
-        for album_doc in albums_cursor:
-            # The first image is already in the document, we just need to format it
-            if album_doc.get("first_image"):
-                 album_doc["images"] = [album_doc["first_image"]]
-            else:
-                 album_doc["images"] = []
-            
-            albums_list.append(Album(**album_doc))
-        # print("Albums cursor:", albums_list)
-        return albums_list
-    except Exception as e:
-        print(f"Error in get_all_albums: {e}")
-        return []
+    # Failures propagate: an empty list here would be cached and materialized as if real
+    albums_list = []
+    async for album_doc in db.albums.find():
+        album_doc["id"] = str(album_doc["_id"])
+        # Albums created before the summary fields existed get them on first read
+        if "image_count" not in album_doc:
+            album_doc.update(await refresh_album_summary(db, album_doc["id"]))
+
+        cover = album_doc.get("cover_image")
+        album_doc["images"] = [cover] if cover else []
+        albums_list.append(Album(**album_doc))
+    return albums_list
 
-def get_album_by_id(db: Database, album_id: str) -> Optional[AlbumWithImages]:
+async def get_album_by_id(db: AsyncDatabase, album_id: str) -> Optional[AlbumWithImages]:
     """Get album by ID with all images"""
-    album = db.albums.find_one({"_id": ObjectId(album_id)})
+    album = await db.albums.find_one({"_id": ObjectId(album_id)})
     if not album:
         return None
     
     album["id"] = str(album["_id"])
     
     # Get all images for this album
-    images = list(db.images.find({"album_id": album_id}))
+    images = await db.images.find({"album_id": album_id}).to_list()
     for image in images:
         image["id"] = str(image["_id"])
     
@@ -76,104 +78,101 @@ def get_album_by_id(db: Database, album_id: str) -> Optional[AlbumWithImages]:
     
     return AlbumWithImages(**album)
 
-def update_album(db: Database, album_id: str, album: AlbumUpdate) -> bool:
+async def update_album(db: AsyncDatabase, album_id: str, album: AlbumUpdate) -> bool:
     """Update album information"""
     update_data = {k: v for k, v in album.model_dump().items() if v is not None}
     update_data["updated_at"] = datetime.utcnow()
     
-    result = db.albums.update_one(
+    result = await db.albums.update_one(
         {"_id": ObjectId(album_id)}, 
         {"$set": update_data}
     )
+    await collection_changed(db, "gallery")
     return result.modified_count > 0
 
-def delete_album(db: Database, album_id: str) -> bool:
+async def delete_album(db: AsyncDatabase, album_id: str) -> bool:
     """Delete album and all its images from storage"""
     # Get all images in the album
-    images = list(db.images.find({"album_id": album_id}))
+    images = await db.images.find({"album_id": album_id}).to_list()
     
-    # Delete image files from storage
+    # Release image files from storage
     for image in images:
         try:
-            if os.path.exists(image["file_path"]):
-                os.remove(image["file_path"])
+            await release_media(db, image["file_path"])
         except Exception as e:
-            print(f"Error deleting file {image['file_path']}: {e}")
+            print(f"Error releasing file {image['file_path']}: {e}")
     
     # Delete all images from database
-    db.images.delete_many({"album_id": album_id})
+    await db.images.delete_many({"album_id": album_id})
     
     # Delete album from database
-    result = db.albums.delete_one({"_id": ObjectId(album_id)})
+    result = await db.albums.delete_one({"_id": ObjectId(album_id)})
+    await collection_changed(db, "gallery")
     return result.deleted_count > 0
 
-def upload_image_to_album(db: Database, album_id: str, file, alt_text: Optional[str] = None) -> str:
+async def upload_image_to_album(db: AsyncDatabase, album_id: str, file, alt_text: Optional[str] = None) -> str:
     """Upload an image to an album"""
     # Check if album exists
-    album = db.albums.find_one({"_id": ObjectId(album_id)})
+    album = await db.albums.find_one({"_id": ObjectId(album_id)})
     if not album:
         raise ValueError("Album not found")
     
-    # Create unique filename
-    file_extension = os.path.splitext(file.filename)[1]
-    unique_filename = f"{uuid.uuid4()}{file_extension}"
-    
-    # Create album directory if it doesn't exist
-    album_dir = os.path.join("media", "gallery", album_id)
-    os.makedirs(album_dir, exist_ok=True)
-    
-    # Save file
-    file_path = os.path.join(album_dir, unique_filename)
-    with open(file_path, "wb") as buffer:
-        shutil.copyfileobj(file.file, buffer)
-    
-    # Get file size
-    file_size = os.path.getsize(file_path)
+    # Save file; identical images share one blob across albums
+    blob = await store_blob(db, file, "image")
+    file_path = blob["path"]
     
     # Create image record
     image_data = {
         "album_id": album_id,
-        "filename": unique_filename,
+        "filename": os.path.basename(file_path),
         "original_filename": file.filename,
         "file_path": file_path,
-        "file_size": file_size,
+        "file_size": blob["size"],
+        "sha256": blob["_id"],
         "mime_type": file.content_type,
         "alt_text": alt_text,
         "created_at": datetime.utcnow(),
         "updated_at": datetime.utcnow()
     }
     
-    result = db.images.insert_one(image_data)
+    result = await db.images.insert_one(image_data)
+    await refresh_album_summary(db, album_id)
+    await collection_changed(db, "gallery")
+    schedule_image_variants(db, str(result.inserted_id))
     return str(result.inserted_id)
 
-def get_image_by_id(db: Database, image_id: str) -> Optional[dict]:
+async def get_image_by_id(db: AsyncDatabase, image_id: str) -> Optional[dict]:
     """Get image by ID"""
-    image = db.images.find_one({"_id": ObjectId(image_id)})
+    image = await db.images.find_one({"_id": ObjectId(image_id)})
     if image:
         image["id"] = str(image["_id"])
     return image
 
-def delete_image(db: Database, image_id: str) -> bool:
+async def delete_image(db: AsyncDatabase, image_id: str) -> bool:
     """Delete image from album and storage"""
-    image = db.images.find_one({"_id": ObjectId(image_id)})
+    image = await db.images.find_one({"_id": ObjectId(image_id)})
     if not image:
         return False
     
-    # Delete file from storage
+    # Release file from storage
     try:
-        if os.path.exists(image["file_path"]):
-            os.remove(image["file_path"])
+        await release_media(db, image["file_path"])
     except Exception as e:
-        print(f"Error deleting file {image['file_path']}: {e}")
+        print(f"Error releasing file {image['file_path']}: {e}")
     
     # Delete image record from database
-    result = db.images.delete_one({"_id": ObjectId(image_id)})
+    result = await db.images.delete_one({"_id": ObjectId(image_id)})
+    await refresh_album_summary(db, image["album_id"])
+    await collection_changed(db, "gallery")
     return result.deleted_count > 0
 
-def update_image_alt_text(db: Database, image_id: str, alt_text: str) -> bool:
+async def update_image_alt_text(db: AsyncDatabase, image_id: str, alt_text: str) -> bool:
     """Update image alt text"""
-    result = db.images.update_one(
+    result = await db.images.update_one(
         {"_id": ObjectId(image_id)},
         {"$set": {"alt_text": alt_text, "updated_at": datetime.utcnow()}}
     )
+    # Keep the album's denormalized cover in step
+    await db.albums.update_one({"cover_image.id": image_id}, {"$set": {"cover_image.alt_text": alt_text}})
+    await collection_changed(db, "gallery")
     return result.modified_count > 0 
\ No newline at end of file
@@ -0,0 +1,90 @@
+import asyncio
+import json
+from dataclasses import dataclass
+from typing import Any, Awaitable, Callable, Dict, List, Optional
+from pymongo.asynchronous.database import AsyncDatabase
+from app.schemas.course import Course
+from app.schemas.gallery import Album
+from app.services.cache import serialize
+from app.services.content_service import get_all_content
+from app.services.course_service import get_all_courses
+from app.services.event_service import get_carousel_items, get_section_events
+from app.services.gallery_service import get_all_albums
+from app.services.pagination import MAX_PAGE_SIZE, PageParams
+from app.services.versioning import HOME_NAMESPACE, HOME_NAMESPACES, get_versions
+
+HOME_ID = HOME_NAMESPACE
+
+@dataclass
+class HomeSection:
+    namespace: str
+    load: Callable[[AsyncDatabase], Awaitable[Any]]
+    response_model: Any = Any
+    by_alias: bool = True
+
+async def _load_courses(db: AsyncDatabase) -> List[dict]:
+    return (await get_all_courses(db, PageParams(limit=MAX_PAGE_SIZE))).items
+
+# Each key of the bundle, the namespace it is built from, and how it is
+# serialized (matching the standalone endpoint that serves it)
+HOME_SECTIONS: Dict[str, HomeSection] = {
+    "content": HomeSection("content", get_all_content),
+    "carousel": HomeSection("events", get_carousel_items, List[dict]),
+    "events": HomeSection("events", get_section_events, List[dict]),
+    "courses": HomeSection("courses", _load_courses, List[Course]),
+    "albums": HomeSection("gallery", get_all_albums, List[Album], by_alias=False),
+}
+
+async def _source_versions(db: AsyncDatabase) -> Dict[str, int]:
+    return {namespace: doc["version"] for namespace, doc in (await get_versions(db, HOME_NAMESPACES)).items()}
+
+async def get_home_bundle(db: AsyncDatabase) -> bytes:
+    """The landing-page bundle as JSON, rebuilding only the sections that are stale.
+
+    The bundle lives in one ``materialized`` document holding each section
+    pre-serialized next to the source version it was built from, so a
+    fresh bundle costs two small reads and no re-serialization.
+    """
+    versions = await _source_versions(db)
+    bundle = await db.materialized.find_one({"_id": HOME_ID}) or {}
+    sections = bundle.get("sections", {})
+    built_from = bundle.get("versions", {})
+
+    stale = [
+        name for name, section in HOME_SECTIONS.items()
+        if name not in sections or built_from.get(name) != versions[section.namespace]
+    ]
+    if stale:
+        update = {}
+        for name in stale:
+            section = HOME_SECTIONS[name]
+            data = await section.load(db)
+            sections[name] = serialize(data, section.response_model, section.by_alias).decode()
+            update[f"sections.{name}"] = sections[name]
+            # The version read before loading, so a write racing the build leaves it stale
+            update[f"versions.{name}"] = versions[section.namespace]
+        await db.materialized.update_one({"_id": HOME_ID}, {"$set": update}, upsert=True)
+
+    return ("{" + ",".join(f"{json.dumps(name)}:{sections[name]}" for name in HOME_SECTIONS) + "}").encode()
+
+_refresh_task: Optional[asyncio.Task] = None
+_refresh_requested = False
+
+async def _refresh_home(db: AsyncDatabase):
+    global _refresh_requested
+    while _refresh_requested:
+        _refresh_requested = False
+        try:
+            await get_home_bundle(db)
+        except Exception as e:
+            print(f"Home bundle refresh failed: {e}")
+
+def schedule_home_refresh(db: AsyncDatabase):
+    """Rebuild the stale sections in the background after a write.
+
+    Writes arriving while a rebuild runs are folded into one more pass.
+    """
+    global _refresh_task, _refresh_requested
+    _refresh_requested = True
+    if _refresh_task is None or _refresh_task.done():
+        _refresh_task = asyncio.create_task(_refresh_home(db))
@@ -0,0 +1,124 @@
+import asyncio
+import os
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+from typing import List
+from bson import ObjectId
+from pymongo.asynchronous.database import AsyncDatabase
+from app.config import settings
+from app.services.media_store import adopt_legacy_file, derivative_path, release_media
+
+# Widths generated for every gallery image; anything at or above the
+# original width is skipped rather than upscaled
+VARIANT_WIDTHS = (320, 640, 1280)
+VARIANT_FORMATS = {
+    "webp": {"format": "WEBP", "quality": 80, "method": 4},
+    "jpeg": {"format": "JPEG", "quality": 82, "optimize": True, "progressive": True},
+}
+
+image_variant_executor = ThreadPoolExecutor(
+    max_workers=settings.IMAGE_VARIANT_WORKERS,
+    thread_name_prefix="image-variants"
+)
+
+# Keep references so pending jobs are not garbage collected mid-flight
+_pending_jobs = set()
+
+def _for_format(image, extension: str):
+    if extension == "jpeg" and image.mode != "RGB":
+        return image.convert("RGB")
+    if extension == "webp" and image.mode not in ("RGB", "RGBA"):
+        return image.convert("RGBA")
+    return image
+
+def render_variants(source_path: str, sha256: str) -> List[dict]:
+    """Resize one original into every configured width and format (runs on a worker thread)"""
+    from PIL import Image as PILImage, ImageOps
+
+    variants = []
+    with PILImage.open(source_path) as original:
+        original = ImageOps.exif_transpose(original)
+        for width in VARIANT_WIDTHS:
+            if width >= original.width:
+                continue
+            height = round(original.height * width / original.width)
+            resized = original.resize((width, height), PILImage.Resampling.LANCZOS)
+            for extension, options in VARIANT_FORMATS.items():
+                path = derivative_path(sha256, f"w{width}", f".{extension}")
+                if not os.path.exists(path):
+                    os.makedirs(os.path.dirname(path), exist_ok=True)
+                    image = _for_format(resized, extension)
+                    tmp_path = f"{path}.tmp"
+                    image.save(tmp_path, **options)
+                    os.replace(tmp_path, path)
+                variants.append({
+                    "width": width,
+                    "height": height,
+                    "format": extension,
+                    "file_path": path,
+                    "file_size": os.path.getsize(path),
+                })
+    return variants
+
+async def generate_image_variants(db: AsyncDatabase, image_id: str):
+    """Render the responsive variants of a gallery image and record them on its document"""
+    from app.services.gallery_service import refresh_album_summary
+    from app.services.versioning import collection_changed
+
+    image = await db.images.find_one({"_id": ObjectId(image_id)})
+    if not image:
+        return
+    loop = asyncio.get_running_loop()
+    try:
+        variants = await loop.run_in_executor(
+            image_variant_executor, render_variants, image["file_path"], image["sha256"]
+        )
+    except ImportError:
+        print("Pillow not installed, skipping image variants")
+        return
+    except Exception as e:
+        print(f"Failed to generate variants for image {image_id}: {e}")
+        variants = []
+
+    await db.images.update_one(
+        {"_id": image["_id"]},
+        {"$set": {"variants": variants, "variants_updated_at": datetime.utcnow()}}
+    )
+    await refresh_album_summary(db, image["album_id"])
+    await collection_changed(db, "gallery")
+
+def schedule_image_variants(db: AsyncDatabase, image_id: str):
+    """Generate variants in the background so the upload request returns immediately"""
+    task = asyncio.create_task(generate_image_variants(db, image_id))
+    _pending_jobs.add(task)
+    task.add_done_callback(_pending_jobs.discard)
+
+async def _adopt_legacy_image(db: AsyncDatabase, image: dict) -> bool:
+    """Move an image stored before content addressing into the blob store, so it has a sha256"""
+    blob = await adopt_legacy_file(db, image["file_path"], image.get("mime_type"))
+    result = await db.images.update_one(
+        {"_id": image["_id"], "file_path": image["file_path"]},
+        {"$set": {
+            "file_path": blob["path"],
+            "filename": os.path.basename(blob["path"]),
+            "sha256": blob["_id"],
+            "updated_at": datetime.utcnow(),
+        }}
+    )
+    if not result.matched_count:
+        # Deleted or replaced meanwhile; drop the reference taken for it
+        await release_media(db, blob["path"])
+        return False
+    return True
+
+async def backfill_image_variants(db: AsyncDatabase):
+    """Queue variant generation for images uploaded before the pipeline existed"""
+    async for image in db.images.find({"variants": {"$exists": False}}, {"_id": 1, "sha256": 1, "file_path": 1, "mime_type": 1}):
+        if "sha256" not in image:
+            try:
+                if not await _adopt_legacy_image(db, image):
+                    continue
+            except Exception as e:
+                print(f"Failed to move legacy image {image['_id']} into the blob store: {e}")
+                continue
+        await generate_image_variants(db, str(image["_id"]))
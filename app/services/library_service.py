@@ -1,70 +1,66 @@
-from pymongo.database import Database
-from app.schemas.library import LibraryItemCreate, LibraryItemUpdate
+from pymongo.asynchronous.database import AsyncDatabase
+from app.schemas.library import LibraryItem, LibraryItemCreate, LibraryItemUpdate
 from bson import ObjectId
 from fastapi import UploadFile
-import shutil
-import os
-from typing import Optional
+from typing import List, Optional
 from app.config import settings
+from app.services.versioning import collection_changed
+from app.services.pagination import Page, PageParams, paginate
+from app.services.fields import projection_for
+from app.services.search_service import search_page
+from app.services.media_store import store_media, release_media
 
-MEDIA_DIR = "media"
-
-def save_upload_file(upload_file: UploadFile, destination: str) -> str:
-    try:
-        with open(destination, "wb") as buffer:
-            shutil.copyfileobj(upload_file.file, buffer)
-    finally:
-        upload_file.file.close()
-    return destination
-
-def get_all_library_items(db: Database):
-    items = list(db.library.find())
-    print("Raw items from DB:", items)
-    for item in items:
+async def get_all_library_items(
+    db: AsyncDatabase,
+    params: Optional[PageParams] = None,
+    fields: Optional[List[str]] = None,
+    q: Optional[str] = None
+) -> Page:
+    projection = projection_for(LibraryItem, fields)
+    if q:
+        page = await search_page(db.library, q, params, projection)
+    else:
+        page = await paginate(db.library, params=params, projection=projection)
+    for item in page.items:
         item["id"] = str(item["_id"])
         del item["_id"]
         if item.get("file_url"):
             item["file_url"] = f"{settings.MEDIA_URL}{item['file_url']}"
-    print("Processed items:", items)
-    return items
+    return page
 
-def create_new_library_item(db: Database, item: LibraryItemCreate, file: Optional[UploadFile] = None):
+async def create_new_library_item(db: AsyncDatabase, item: LibraryItemCreate, file: Optional[UploadFile] = None):
     item_dict = item.dict()
     
     if file:
-        file_location = os.path.join(MEDIA_DIR, file.filename)
-        save_upload_file(file, file_location)
-        item_dict["file_url"] = f"/media/{file.filename}"
+        item_dict["file_url"] = await store_media(db, file, "document")
 
-    result = db.library.insert_one(item_dict)
+    result = await db.library.insert_one(item_dict)
+    await collection_changed(db, "library")
     return str(result.inserted_id)
 
-def update_library_item_by_id(db: Database, item_id: str, item: LibraryItemUpdate, file: Optional[UploadFile] = None):
+async def update_library_item_by_id(db: AsyncDatabase, item_id: str, item: LibraryItemUpdate, file: Optional[UploadFile] = None):
     item_dict = item.dict(exclude_unset=True)
     
-    old_item = db.library.find_one({"_id": ObjectId(item_id)})
+    old_item = await db.library.find_one({"_id": ObjectId(item_id)})
+    if not old_item:
+        # Before storing the upload, whose blob reference nothing would release
+        return False
 
     if file:
-        if old_item and old_item.get("file_url"):
-            old_file_path = old_item["file_url"].replace("/media/", f"{MEDIA_DIR}/", 1)
-            if os.path.exists(old_file_path):
-                os.remove(old_file_path)
-        
-        file_location = os.path.join(MEDIA_DIR, file.filename)
-        save_upload_file(file, file_location)
-        item_dict["file_url"] = f"/media/{file.filename}"
+        item_dict["file_url"] = await store_media(db, file, "document")
+        await release_media(db, old_item.get("file_url"))
     
-    result = db.library.update_one(
+    result = await db.library.update_one(
         {"_id": ObjectId(item_id)}, {"$set": item_dict}
     )
+    await collection_changed(db, "library")
     return result.modified_count > 0
 
-def delete_library_item_by_id(db: Database, item_id: str):
-    item = db.library.find_one({"_id": ObjectId(item_id)})
-    if item and item.get("file_url"):
-        file_path = item["file_url"].replace("/media/", f"{MEDIA_DIR}/", 1)
-        if os.path.exists(file_path):
-            os.remove(file_path)
+async def delete_library_item_by_id(db: AsyncDatabase, item_id: str):
+    item = await db.library.find_one({"_id": ObjectId(item_id)})
+    if item:
+        await release_media(db, item.get("file_url"))
             
-    result = db.library.delete_one({"_id": ObjectId(item_id)})
+    result = await db.library.delete_one({"_id": ObjectId(item_id)})
+    await collection_changed(db, "library")
     return result.deleted_count > 0 
\ No newline at end of file
@@ -0,0 +1,134 @@
+import gzip
+import mimetypes
+import os
+import shutil
+from typing import Optional
+from starlette.datastructures import Headers
+from starlette.responses import FileResponse, Response
+from starlette.staticfiles import NotModifiedResponse, StaticFiles
+
+# Content-hashed paths never change content, so they can be cached forever
+IMMUTABLE_PREFIXES = ("blobs/", "derivatives/")
+IMMUTABLE_CACHE_CONTROL = "public, max-age=31536000, immutable"
+# Legacy per-filename uploads can be overwritten in place, so always revalidate
+MUTABLE_CACHE_CONTROL = "public, no-cache"
+
+# Encodings in server preference order, with the sibling suffix holding each
+ENCODINGS = (("br", ".br"), ("gzip", ".gz"))
+
+# Extensions worth precompressing; images and video are already compressed
+COMPRESSIBLE_EXTENSIONS = {
+    ".pdf", ".doc", ".docx", ".ppt", ".pptx", ".xls", ".xlsx",
+    ".txt", ".csv", ".rtf", ".json", ".svg", ".html",
+}
+# A sibling is only kept if it saves at least this fraction of the original
+MIN_COMPRESSION_SAVING = 0.1
+CHUNK_SIZE = 1024 * 1024
+
+def cache_control_for(relative_path: str) -> str:
+    """Cache-Control for a file addressed relative to the media directory"""
+    return IMMUTABLE_CACHE_CONTROL if relative_path.startswith(IMMUTABLE_PREFIXES) else MUTABLE_CACHE_CONTROL
+
+def _keep_if_smaller(original_path: str, tmp_path: str, sibling_path: str):
+    if os.path.getsize(tmp_path) <= os.path.getsize(original_path) * (1 - MIN_COMPRESSION_SAVING):
+        os.replace(tmp_path, sibling_path)
+    else:
+        os.remove(tmp_path)
+
+def precompress_file(path: str):
+    """Write .gz (and .br, when brotli is installed) siblings of a compressible file.
+
+    Blocking; run it on a worker thread. Siblings that would not save
+    anything meaningful are discarded so the original is served instead.
+    """
+    if os.path.splitext(path)[1].lower() not in COMPRESSIBLE_EXTENSIONS:
+        return
+
+    tmp_path = f"{path}.gz.tmp"
+    with open(path, "rb") as source, gzip.open(tmp_path, "wb", compresslevel=9) as target:
+        shutil.copyfileobj(source, target, CHUNK_SIZE)
+    _keep_if_smaller(path, tmp_path, f"{path}.gz")
+
+    try:
+        import brotli
+    except ImportError:
+        return
+    tmp_path = f"{path}.br.tmp"
+    compressor = brotli.Compressor(quality=11)
+    with open(path, "rb") as source, open(tmp_path, "wb") as target:
+        while chunk := source.read(CHUNK_SIZE):
+            target.write(compressor.process(chunk))
+        target.write(compressor.finish())
+    _keep_if_smaller(path, tmp_path, f"{path}.br")
+
+def precompressed_siblings(path: str):
+    return [f"{path}{suffix}" for _, suffix in ENCODINGS]
+
+def _accepted_encodings(accept_encoding: Optional[str]) -> set:
+    accepted = set()
+    for part in (accept_encoding or "").split(","):
+        coding, _, params = part.strip().partition(";")
+        q = params.strip()
+        if q.startswith("q="):
+            try:
+                if float(q[2:]) == 0:
+                    continue
+            except ValueError:
+                continue
+        if coding:
+            accepted.add(coding.strip().lower())
+    return accepted
+
+class MediaFiles(StaticFiles):
+    """StaticFiles for uploaded media.
+
+    Adds long-lived immutable caching for content-hashed paths and serves a
+    precompressed .br/.gz sibling when the client accepts it. Files go out
+    through FileResponse, which streams from disk and hands the path to the
+    server directly when it supports the pathsend (sendfile) extension.
+    """
+
+    def file_response(self, full_path, stat_result: os.stat_result, scope, status_code: int = 200) -> Response:
+        request_headers = Headers(scope=scope)
+        relative_path = os.path.relpath(full_path, self.directory).replace(os.sep, "/")
+        headers = {
+            "Cache-Control": cache_control_for(relative_path),
+            "Vary": "Accept-Encoding",
+        }
+        media_type = mimetypes.guess_type(str(full_path))[0] or "application/octet-stream"
+
+        path = full_path
+        accepted = _accepted_encodings(request_headers.get("accept-encoding"))
+        for encoding, suffix in ENCODINGS:
+            if encoding not in accepted:
+                continue
+            try:
+                sibling_stat = os.stat(f"{full_path}{suffix}")
+            except OSError:
+                continue
+            path, stat_result = f"{full_path}{suffix}", sibling_stat
+            headers["Content-Encoding"] = encoding
+            break
+
+        response = FileResponse(
+            path, status_code=status_code, stat_result=stat_result,
+            media_type=media_type, headers=headers
+        )
+        if self.is_not_modified(response.headers, request_headers):
+            return NotModifiedResponse(response.headers)
+        return response
+
+class VideoFileResponse(FileResponse):
+    """FileResponse for video playback.
+
+    Range, If-Range and multipart/byteranges requests are answered with
+    206 by FileResponse. Each connection holds at most one chunk of the file
+    in memory, so memory per viewer stays constant whatever the file size.
+    """
+    chunk_size = 256 * 1024
+
+    def __init__(self, path: str, media_dir: str = "media", **kwargs):
+        relative_path = os.path.relpath(path, media_dir).replace(os.sep, "/")
+        headers = {"Cache-Control": cache_control_for(relative_path), **kwargs.pop("headers", {})}
+        media_type = kwargs.pop("media_type", None) or mimetypes.guess_type(path)[0] or "video/mp4"
+        super().__init__(path, media_type=media_type, headers=headers, **kwargs)
@@ -0,0 +1,192 @@
+import asyncio
+import glob
+import hashlib
+import os
+import uuid
+from datetime import datetime, timedelta
+from typing import Optional
+from fastapi import HTTPException, UploadFile
+from pymongo import ReturnDocument
+from pymongo.errors import DuplicateKeyError
+from pymongo.asynchronous.database import AsyncDatabase
+from starlette.concurrency import run_in_threadpool
+from app.config import settings
+from app.services.uploads import remove_file, save_upload
+from app.services.media_files import precompress_file, precompressed_siblings
+
+MEDIA_DIR = "media"
+BLOB_DIR = os.path.join(MEDIA_DIR, "blobs")
+STAGING_DIR = os.path.join(BLOB_DIR, ".staging")
+DERIVATIVE_DIR = os.path.join(MEDIA_DIR, "derivatives")
+# How often an upload waits for the collector to finish deleting the same content
+TOMBSTONE_RETRIES = 6
+
+def blob_path(sha256: str, extension: str) -> str:
+    """Sharded on-disk location of a blob: media/blobs/ab/cd/abcd...<ext>"""
+    return os.path.join(BLOB_DIR, sha256[:2], sha256[2:4], f"{sha256}{extension}")
+
+def derivative_path(sha256: str, variant: str, extension: str) -> str:
+    """Location of a file derived from a blob (e.g. a resized image), sharded like the blob"""
+    return os.path.join(DERIVATIVE_DIR, sha256[:2], sha256[2:4], f"{sha256}-{variant}{extension}")
+
+def blob_id_from_reference(reference: str) -> Optional[str]:
+    """Return the SHA-256 a stored media reference points at, or None for legacy paths"""
+    path = reference.lstrip("/")
+    if not path.startswith(BLOB_DIR + "/"):
+        return None
+    return os.path.splitext(os.path.basename(path))[0]
+
+# Keep references so background precompression is not garbage collected
+_pending_jobs = set()
+
+async def _precompress(path: str):
+    try:
+        await run_in_threadpool(precompress_file, path)
+    except Exception as e:
+        print(f"Failed to precompress {path}: {e}")
+
+async def _take_reference(db: AsyncDatabase, sha256: str, inserted: dict, now: datetime) -> Optional[dict]:
+    """Increment a blob's refcount, creating its document if needed.
+
+    Returns the document as it was before, or None if this call created it.
+    A document the collector has marked ``deleting`` is left alone: the
+    upsert collides with it, and we wait for the collector to remove it.
+    """
+    for attempt in range(TOMBSTONE_RETRIES):
+        try:
+            return await db.media_blobs.find_one_and_update(
+                {"_id": sha256, "deleting": {"$ne": True}},
+                {"$inc": {"refcount": 1}, "$set": {"updated_at": now}, "$setOnInsert": inserted},
+                upsert=True,
+                return_document=ReturnDocument.BEFORE,
+            )
+        except DuplicateKeyError:
+            await asyncio.sleep(0.05 * 2 ** attempt)
+    raise HTTPException(status_code=503, detail="Media is being cleaned up, please retry the upload")
+
+async def _reference_blob(db: AsyncDatabase, sha256: str, source_path: str, inserted: dict) -> dict:
+    """Take a reference to a blob, moving ``source_path`` into place if the blob has no file yet"""
+    now = datetime.utcnow()
+    inserted = {**inserted, "created_at": now}
+    before = await _take_reference(db, sha256, inserted, now)
+    if before is None:
+        blob = {"_id": sha256, **inserted, "refcount": 1, "updated_at": now}
+    else:
+        blob = {**before, "refcount": before.get("refcount", 0) + 1, "updated_at": now}
+
+    # A new document never has a file yet: the collector unlinks before it deletes
+    if before is not None and await run_in_threadpool(os.path.exists, blob["path"]):
+        await run_in_threadpool(remove_file, source_path)
+    else:
+        await run_in_threadpool(os.makedirs, os.path.dirname(blob["path"]), exist_ok=True)
+        await run_in_threadpool(os.replace, source_path, blob["path"])
+        # Build .gz/.br siblings off the request; until they exist the original is served
+        task = asyncio.create_task(_precompress(blob["path"]))
+        _pending_jobs.add(task)
+        task.add_done_callback(_pending_jobs.discard)
+    return blob
+
+async def store_blob(db: AsyncDatabase, upload_file: UploadFile, kind: str) -> dict:
+    """Store an upload by content and take a reference to it.
+
+    Identical files share one blob on disk; the blob's refcount in the
+    media_blobs collection counts the documents pointing at it. Returns the
+    media_blobs document (``_id`` is the SHA-256, ``path`` the file on disk).
+    """
+    extension = os.path.splitext(upload_file.filename or "")[1].lower()
+    staged = await save_upload(upload_file, os.path.join(STAGING_DIR, uuid.uuid4().hex), kind)
+    path = blob_path(staged.sha256, extension)
+
+    inserted = {"path": path, "size": staged.size, "content_type": staged.content_type}
+    try:
+        return await _reference_blob(db, staged.sha256, staged.path, inserted)
+    except BaseException:
+        await run_in_threadpool(remove_file, staged.path)
+        raise
+
+def _hash_file(path: str) -> str:
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(1024 * 1024), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+async def adopt_legacy_file(db: AsyncDatabase, legacy_path: str, content_type: Optional[str] = None) -> dict:
+    """Move a file saved under its upload name into the blob store and take a reference to it.
+
+    Returns the media_blobs document like store_blob. The legacy path no
+    longer exists afterwards, so callers must point their document at the
+    blob's ``path``.
+    """
+    sha256 = await run_in_threadpool(_hash_file, legacy_path)
+    extension = os.path.splitext(legacy_path)[1].lower()
+    inserted = {
+        "path": blob_path(sha256, extension),
+        "size": await run_in_threadpool(os.path.getsize, legacy_path),
+        "content_type": content_type,
+    }
+    return await _reference_blob(db, sha256, legacy_path, inserted)
+
+async def store_media(db: AsyncDatabase, upload_file: UploadFile, kind: str) -> str:
+    """Store an upload via store_blob and return its web path (``/media/blobs/...``).
+
+    The path never changes for given content, so it can be cached forever.
+    """
+    blob = await store_blob(db, upload_file, kind)
+    return "/" + blob["path"]
+
+async def release_media(db: AsyncDatabase, reference: Optional[str]):
+    """Drop one reference to stored media.
+
+    Blobs are only unlinked by collect_garbage once unreferenced for a grace
+    period, so a concurrent upload of the same content cannot lose its file.
+    Legacy per-filename paths are deleted directly as before.
+    """
+    if not reference:
+        return
+    sha256 = blob_id_from_reference(reference)
+    if sha256 is None:
+        legacy_path = reference.lstrip("/")
+        if legacy_path.startswith(MEDIA_DIR + "/"):
+            await run_in_threadpool(remove_file, legacy_path)
+        return
+    await db.media_blobs.update_one(
+        {"_id": sha256},
+        {"$inc": {"refcount": -1}, "$set": {"updated_at": datetime.utcnow()}}
+    )
+
+async def collect_garbage(db: AsyncDatabase, grace_seconds: Optional[int] = None) -> int:
+    """Delete blobs that have been unreferenced for longer than the grace period"""
+    if grace_seconds is None:
+        grace_seconds = settings.MEDIA_GC_GRACE_SECONDS
+    cutoff = datetime.utcnow() - timedelta(seconds=grace_seconds)
+    removed = 0
+    async for candidate in db.media_blobs.find({"refcount": {"$lte": 0}, "updated_at": {"$lt": cutoff}}):
+        # Mark it first, re-checking the refcount atomically; uploads of the
+        # same content then wait rather than reference a file about to go.
+        # A mark left by an interrupted pass is picked up again here.
+        blob = await db.media_blobs.find_one_and_update(
+            {"_id": candidate["_id"], "refcount": {"$lte": 0}},
+            {"$set": {"deleting": True}},
+        )
+        if blob is None:
+            continue
+        await run_in_threadpool(remove_file, blob["path"])
+        for path in precompressed_siblings(blob["path"]):
+            await run_in_threadpool(remove_file, path)
+        for path in await run_in_threadpool(glob.glob, derivative_path(blob["_id"], "*", "*")):
+            await run_in_threadpool(remove_file, path)
+        await db.media_blobs.delete_one({"_id": blob["_id"], "deleting": True})
+        removed += 1
+    return removed
+
+async def run_garbage_collector(db: AsyncDatabase):
+    """Background loop collecting unreferenced blobs every MEDIA_GC_INTERVAL_SECONDS"""
+    while True:
+        try:
+            removed = await collect_garbage(db)
+            if removed:
+                print(f"Media GC removed {removed} unreferenced blobs")
+        except Exception as e:
+            print(f"Media GC failed: {e}")
+        await asyncio.sleep(settings.MEDIA_GC_INTERVAL_SECONDS)
@@ -0,0 +1,305 @@
+import time
+from contextvars import ContextVar
+from bisect import bisect_left
+from typing import Callable, Dict, List, Optional, Tuple
+from pymongo import monitoring
+
+CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+SIZE_BUCKETS = (256, 1024, 4096, 16384, 65536, 262144, 1048576, 4194304, 16777216)
+# Requests that matched no route share one label so bad paths can't blow up cardinality
+UNMATCHED_ROUTE = "<unmatched>"
+
+# ASGI scope of the request being handled, for code that wants to tag work with its route
+current_request: ContextVar[Optional[dict]] = ContextVar("current_request", default=None)
+
+def _escape(value: str) -> str:
+    return value.replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+def _labels(names: Tuple[str, ...], values: Tuple[str, ...], extra: str = "") -> str:
+    pairs = [f'{name}="{_escape(str(value))}"' for name, value in zip(names, values)]
+    if extra:
+        pairs.append(extra)
+    return "{" + ",".join(pairs) + "}" if pairs else ""
+
+def _number(value: float) -> str:
+    if value == float("inf"):
+        return "+Inf"
+    return repr(float(value)) if isinstance(value, float) and not value.is_integer() else str(int(value))
+
+class Metric:
+    """A labelled metric family rendered in the Prometheus text format.
+
+    Everything here is updated from the event loop (pymongo's async client
+    calls its listeners there too), so no locking is needed.
+    """
+
+    kind = "untyped"
+
+    def __init__(self, name: str, documentation: str, labels: Tuple[str, ...] = ()):
+        self.name = name
+        self.documentation = documentation
+        self.label_names = labels
+
+    def samples(self) -> List[str]:
+        raise NotImplementedError
+
+    def render(self) -> List[str]:
+        return [f"# HELP {self.name} {self.documentation}", f"# TYPE {self.name} {self.kind}", *self.samples()]
+
+class Counter(Metric):
+    kind = "counter"
+
+    def __init__(self, name: str, documentation: str, labels: Tuple[str, ...] = ()):
+        super().__init__(name, documentation, labels)
+        self._values: Dict[Tuple[str, ...], float] = {}
+
+    def inc(self, *labels: str, amount: float = 1):
+        self._values[labels] = self._values.get(labels, 0) + amount
+
+    def samples(self) -> List[str]:
+        return [f"{self.name}{_labels(self.label_names, key)} {_number(value)}" for key, value in sorted(self._values.items())]
+
+class Gauge(Metric):
+    """A gauge that is either set directly or read from ``callback`` at scrape time"""
+
+    kind = "gauge"
+
+    def __init__(self, name: str, documentation: str, callback: Optional[Callable[[], float]] = None):
+        super().__init__(name, documentation)
+        self.callback = callback
+        self.value = 0
+
+    def inc(self, amount: float = 1):
+        self.value += amount
+
+    def dec(self, amount: float = 1):
+        self.value -= amount
+
+    def samples(self) -> List[str]:
+        value = self.callback() if self.callback else self.value
+        return [f"{self.name} {_number(value)}"]
+
+class CounterFunction(Gauge):
+    """A counter kept elsewhere (e.g. cache hit totals), read at scrape time"""
+
+    kind = "counter"
+
+class Histogram(Metric):
+    kind = "histogram"
+
+    def __init__(self, name: str, documentation: str, labels: Tuple[str, ...] = (), buckets: Tuple[float, ...] = LATENCY_BUCKETS):
+        super().__init__(name, documentation, labels)
+        self.buckets = tuple(buckets) + (float("inf"),)
+        # labels -> (per-bucket counts, sum, count)
+        self._values: Dict[Tuple[str, ...], list] = {}
+
+    def observe(self, value: float, *labels: str):
+        entry = self._values.get(labels)
+        if entry is None:
+            entry = self._values[labels] = [[0] * len(self.buckets), 0.0, 0]
+        entry[0][bisect_left(self.buckets, value)] += 1
+        entry[1] += value
+        entry[2] += 1
+
+    def samples(self) -> List[str]:
+        lines = []
+        for key, (counts, total, count) in sorted(self._values.items()):
+            cumulative = 0
+            for bound, bucket_count in zip(self.buckets, counts):
+                cumulative += bucket_count
+                le = f'le="{_number(bound)}"'
+                lines.append(f"{self.name}_bucket{_labels(self.label_names, key, le)} {cumulative}")
+            lines.append(f"{self.name}_sum{_labels(self.label_names, key)} {_number(total)}")
+            lines.append(f"{self.name}_count{_labels(self.label_names, key)} {count}")
+        return lines
+
+REGISTRY: List[Metric] = []
+
+def register(metric: Metric) -> Metric:
+    REGISTRY.append(metric)
+    return metric
+
+def render_metrics() -> bytes:
+    lines = []
+    for metric in REGISTRY:
+        lines.extend(metric.render())
+    return ("\n".join(lines) + "\n").encode()
+
+http_requests = register(Counter(
+    "http_requests_total", "HTTP requests handled, by route template and status code",
+    ("method", "route", "status"),
+))
+http_request_duration = register(Histogram(
+    "http_request_duration_seconds", "Time from request start to the end of the response body",
+    ("method", "route"),
+))
+http_response_size = register(Histogram(
+    "http_response_size_bytes", "Response body size", ("method", "route"), buckets=SIZE_BUCKETS,
+))
+http_in_flight = register(Gauge("http_requests_in_flight", "HTTP requests currently being handled"))
+
+mongo_commands = register(Counter(
+    "mongodb_commands_total", "MongoDB commands sent, by command name and outcome", ("command", "outcome"),
+))
+mongo_command_duration = register(Histogram(
+    "mongodb_command_duration_seconds", "MongoDB command round-trip time", ("command",),
+))
+
+class MongoCommandMetrics(monitoring.CommandListener):
+    """Count and time every command the driver sends"""
+
+    def started(self, event):
+        pass
+
+    def succeeded(self, event):
+        mongo_commands.inc(event.command_name, "success")
+        mongo_command_duration.observe(event.duration_micros / 1e6, event.command_name)
+
+    def failed(self, event):
+        mongo_commands.inc(event.command_name, "failure")
+        mongo_command_duration.observe(event.duration_micros / 1e6, event.command_name)
+
+mongo_command_metrics = MongoCommandMetrics()
+
+mongo_pool_connections = register(Gauge("mongodb_pool_connections", "Connections open in the driver pool"))
+mongo_pool_checked_out = register(Gauge("mongodb_pool_checked_out", "Pooled connections currently in use"))
+mongo_pool_waiting = register(Gauge("mongodb_pool_wait_queue", "Operations waiting for a pooled connection"))
+mongo_pool_checkout = register(Histogram("mongodb_pool_checkout_seconds", "Time spent waiting to check out a connection"))
+mongo_pool_checkout_failures = register(Counter(
+    "mongodb_pool_checkout_failures_total", "Connection checkouts that failed, by reason", ("reason",),
+))
+
+class MongoPoolMetrics(monitoring.ConnectionPoolListener):
+    """Track pool size, connections in use and checkout waits"""
+
+    def pool_created(self, event):
+        pass
+
+    def pool_ready(self, event):
+        pass
+
+    def pool_cleared(self, event):
+        pass
+
+    def pool_closed(self, event):
+        pass
+
+    def connection_created(self, event):
+        mongo_pool_connections.inc()
+
+    def connection_ready(self, event):
+        pass
+
+    def connection_closed(self, event):
+        mongo_pool_connections.dec()
+
+    def connection_check_out_started(self, event):
+        mongo_pool_waiting.inc()
+
+    def connection_check_out_failed(self, event):
+        mongo_pool_waiting.dec()
+        mongo_pool_checkout_failures.inc(str(event.reason))
+
+    def connection_checked_out(self, event):
+        mongo_pool_waiting.dec()
+        mongo_pool_checked_out.inc()
+        if event.duration is not None:
+            mongo_pool_checkout.observe(event.duration)
+
+    def connection_checked_in(self, event):
+        mongo_pool_checked_out.dec()
+
+mongo_pool_metrics = MongoPoolMetrics()
+
+def pool_stats() -> dict:
+    return {
+        "connections": mongo_pool_connections.value,
+        "checked_out": mongo_pool_checked_out.value,
+        "waiting": mongo_pool_waiting.value,
+    }
+
+def register_runtime_gauges():
+    """Gauges read from other modules' state at scrape time"""
+    from app.services.auth import password_hash_queue_depth, principal_cache
+    from app.services.cache import response_cache
+
+    def hit_ratio(cache) -> float:
+        lookups = cache.hits + cache.misses
+        return cache.hits / lookups if lookups else 0
+
+    from app.db.circuit_breaker import CLOSED
+    from app.db.database import database_breaker
+
+    register(Gauge("mongodb_circuit_open", "1 while the database circuit breaker is refusing requests", lambda: database_breaker.state != CLOSED))
+    register(Gauge("password_hash_queue_depth", "bcrypt jobs submitted and not yet finished", password_hash_queue_depth))
+    for name, cache in (("response_cache", response_cache), ("principal_cache", principal_cache)):
+        register(CounterFunction(f"{name}_hits_total", f"{name} lookups answered from the cache", lambda c=cache: c.hits))
+        register(CounterFunction(f"{name}_misses_total", f"{name} lookups that missed", lambda c=cache: c.misses))
+        register(Gauge(f"{name}_hit_ratio", f"Share of {name} lookups that hit since startup", lambda c=cache: hit_ratio(c)))
+
+def route_template(scope) -> str:
+    """The matched route's path template, e.g. ``/events/{event_id}``.
+
+    The route in the scope may be relative to the router it was included
+    from, so the prefix is recovered from the part of the request path in
+    front of the route's own rendered path. Requests handed to a mounted
+    app (e.g. static ``/media`` files) are labelled with the mount point.
+    """
+    if "app_root_path" in scope:
+        # Only set by a Mount match, which extends root_path by the mount point
+        mount_path = scope.get("root_path", "")[len(scope["app_root_path"]):]
+        if mount_path:
+            return mount_path
+    route = scope.get("route")
+    template = getattr(route, "path", None)
+    if template is None:
+        return UNMATCHED_ROUTE
+    try:
+        rendered = getattr(route, "path_format", template).format(**scope.get("path_params", {}))
+    except (KeyError, IndexError, ValueError):
+        return template
+    path = scope["path"]
+    if rendered and path.endswith(rendered):
+        return path[:len(path) - len(rendered)] + template
+    return template
+
+class MetricsMiddleware:
+    """Record latency, status, response size and concurrency for every HTTP request.
+
+    Routes are labelled by their path template, which is only known once
+    routing has run, so it is read back from the scope after the request
+    completes.
+    """
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            return await self.app(scope, receive, send)
+
+        start = time.perf_counter()
+        status = 500
+        size = 0
+
+        async def recording_send(message):
+            nonlocal status, size
+            if message["type"] == "http.response.start":
+                status = message["status"]
+            elif message["type"] == "http.response.body":
+                size += len(message.get("body", b""))
+            await send(message)
+
+        http_in_flight.inc()
+        token = current_request.set(scope)
+        try:
+            await self.app(scope, receive, recording_send)
+        finally:
+            current_request.reset(token)
+            http_in_flight.dec()
+            label = route_template(scope)
+            method = scope["method"]
+            http_requests.inc(method, label, str(status))
+            http_request_duration.observe(time.perf_counter() - start, method, label)
+            http_response_size.observe(size, method, label)
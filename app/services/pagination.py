@@ -0,0 +1,139 @@
+import base64
+from dataclasses import dataclass, field
+from typing import Any, List, Optional, Type, Union
+from bson import ObjectId, json_util
+from fastapi import HTTPException, Query, Request, Response
+from fastapi.responses import JSONResponse
+from pydantic import BaseModel
+from pymongo import ASCENDING
+from pymongo.asynchronous.collection import AsyncCollection
+
+DEFAULT_PAGE_SIZE = 100
+MAX_PAGE_SIZE = 1000
+
+@dataclass
+class PageParams:
+    limit: int = DEFAULT_PAGE_SIZE
+    cursor: Optional[str] = None
+
+@dataclass
+class Page:
+    items: List[Any] = field(default_factory=list)
+    next_cursor: Optional[str] = None
+
+def page_params(
+    limit: int = Query(DEFAULT_PAGE_SIZE, ge=1, le=MAX_PAGE_SIZE),
+    cursor: Optional[str] = Query(None, description="Opaque cursor from the previous page's X-Next-Cursor header"),
+) -> PageParams:
+    return PageParams(limit=limit, cursor=cursor)
+
+def _encode_token(position: dict) -> str:
+    return base64.urlsafe_b64encode(json_util.dumps(position).encode()).decode().rstrip("=")
+
+def _decode_token(cursor: str) -> Any:
+    padded = cursor + "=" * (-len(cursor) % 4)
+    return json_util.loads(base64.urlsafe_b64decode(padded))
+
+def encode_cursor(doc: dict, sort_key: str) -> str:
+    """Encode the position just after ``doc`` as an opaque URL-safe token"""
+    position = {"id": doc["_id"]}
+    if sort_key != "_id":
+        position["k"] = doc.get(sort_key)
+    return _encode_token(position)
+
+def decode_cursor(cursor: str) -> dict:
+    try:
+        position = _decode_token(cursor)
+        if not isinstance(position["id"], ObjectId):
+            raise ValueError("cursor id is not an ObjectId")
+        return position
+    except Exception:
+        raise HTTPException(status_code=400, detail="Invalid pagination cursor")
+
+def encode_offset_cursor(offset: int) -> str:
+    """Encode an offset into a ranked result list, for orderings with no stable key"""
+    return _encode_token({"o": offset})
+
+def decode_offset_cursor(cursor: Optional[str]) -> int:
+    if not cursor:
+        return 0
+    try:
+        offset = _decode_token(cursor)["o"]
+        if not isinstance(offset, int) or offset < 0:
+            raise ValueError("bad offset")
+        return offset
+    except Exception:
+        raise HTTPException(status_code=400, detail="Invalid pagination cursor")
+
+async def paginate(
+    collection: AsyncCollection,
+    query: Optional[dict] = None,
+    params: Optional[PageParams] = None,
+    sort_key: str = "_id",
+    direction: int = ASCENDING,
+    projection: Optional[dict] = None,
+    skip: int = 0,
+) -> Page:
+    """Fetch one page of ``collection`` ordered by (sort_key, _id).
+
+    The cursor pins the last (sort_key, _id) pair seen, so every page is an
+    index range scan no matter how deep the client pages. ``skip`` is kept
+    only for callers that still page by offset.
+    """
+    params = params or PageParams()
+    query = dict(query or {})
+    op = "$gt" if direction == ASCENDING else "$lt"
+
+    if params.cursor:
+        position = decode_cursor(params.cursor)
+        if sort_key == "_id":
+            after = {"_id": {op: position["id"]}}
+        else:
+            after = {"$or": [
+                {sort_key: {op: position.get("k")}},
+                {sort_key: position.get("k"), "_id": {op: position["id"]}},
+            ]}
+        query = {"$and": [query, after]} if query else after
+
+    sort = [(sort_key, direction)]
+    if sort_key != "_id":
+        sort.append(("_id", direction))
+        # The cursor is built from the sort key, so an inclusion projection must keep it
+        if projection and all(projection.values()) and sort_key not in projection:
+            projection = {**projection, sort_key: 1}
+
+    cursor = collection.find(query, projection).sort(sort)
+    if skip:
+        cursor = cursor.skip(skip)
+    docs = await cursor.limit(params.limit + 1).to_list()
+
+    next_cursor = None
+    if len(docs) > params.limit:
+        docs = docs[:params.limit]
+        next_cursor = encode_cursor(docs[-1], sort_key)
+    return Page(items=docs, next_cursor=next_cursor)
+
+def page_headers(request: Request, page: Page) -> dict:
+    """X-Next-Cursor and an RFC 8288 Link header pointing at the next page"""
+    if not page.next_cursor:
+        return {}
+    next_url = request.url.include_query_params(cursor=page.next_cursor)
+    return {"X-Next-Cursor": page.next_cursor, "Link": f'<{next_url}>; rel="next"'}
+
+def paged_response(
+    request: Request,
+    response: Response,
+    page: Page,
+    model: Optional[Type[BaseModel]] = None,
+    fields: Optional[List[str]] = None,
+) -> Union[List[Any], JSONResponse]:
+    """Attach the pagination headers to ``response`` and return the page items.
+
+    With a sparse ``fields`` selection the rows cannot satisfy ``model``, so
+    they are returned directly, bypassing the route's response_model.
+    """
+    if fields:
+        from app.services.fields import sparse_items
+        return JSONResponse(sparse_items(model, page.items, fields), headers=page_headers(request, page))
+    response.headers.update(page_headers(request, page))
+    return page.items
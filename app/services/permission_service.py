@@ -1,6 +1,6 @@
-from pymongo.database import Database
+from pymongo.asynchronous.database import AsyncDatabase
 
-def get_all_permissions(db: Database):
+def get_all_permissions(db: AsyncDatabase):
     # In a real app, you might have a predefined list of permissions
     # or manage them in the database.
     # For now, we'll return a hardcoded list.
@@ -1,23 +1,27 @@
-from pymongo.database import Database
+from pymongo.asynchronous.database import AsyncDatabase
 from app.schemas.role import RoleCreate
+from app.services.auth import principal_cache
 from bson import ObjectId
 
-def get_all_roles(db: Database):
-    roles = list(db.roles.find())
+async def get_all_roles(db: AsyncDatabase):
+    roles = await db.roles.find().to_list()
     for role in roles:
         role["id"] = str(role["_id"])
     return roles
 
-def create_new_role(db: Database, role: RoleCreate):
-    result = db.roles.insert_one(role.dict())
+async def create_new_role(db: AsyncDatabase, role: RoleCreate):
+    result = await db.roles.insert_one(role.dict())
     return str(result.inserted_id)
 
-def update_role_by_id(db: Database, role_id: str, role: RoleCreate):
-    result = db.roles.update_one(
+async def update_role_by_id(db: AsyncDatabase, role_id: str, role: RoleCreate):
+    result = await db.roles.update_one(
         {"_id": ObjectId(role_id)}, {"$set": role.dict()}
     )
+    # A role change alters what every cached principal may do
+    await principal_cache.clear()
     return result.modified_count > 0
 
-def delete_role_by_id(db: Database, role_id: str):
-    result = db.roles.delete_one({"_id": ObjectId(role_id)})
+async def delete_role_by_id(db: AsyncDatabase, role_id: str):
+    result = await db.roles.delete_one({"_id": ObjectId(role_id)})
+    await principal_cache.clear()
     return result.deleted_count > 0 
\ No newline at end of file
@@ -0,0 +1,98 @@
+from dataclasses import dataclass
+from typing import Dict, List, Optional
+from fastapi import HTTPException
+from pymongo.asynchronous.collection import AsyncCollection
+from pymongo.asynchronous.database import AsyncDatabase
+from app.services.pagination import Page, PageParams, decode_offset_cursor, encode_offset_cursor
+
+MAX_QUERY_LENGTH = 200
+SUMMARY_LENGTH = 200
+SCORE = {"$meta": "textScore"}
+
+@dataclass
+class SearchTarget:
+    collection: str
+    title_field: str
+    summary_field: str
+
+# Collections searchable through the public /search endpoint. Contact
+# enquiries are searchable too, but only through their admin list.
+PUBLIC_SEARCH_TARGETS: Dict[str, SearchTarget] = {
+    "library": SearchTarget("library", "title", "description"),
+    "events": SearchTarget("events", "title", "description"),
+    "courses": SearchTarget("courses", "name", "description"),
+}
+
+def text_query(q: str) -> dict:
+    q = q.strip()
+    if not q:
+        raise HTTPException(status_code=400, detail="Search query must not be empty")
+    if len(q) > MAX_QUERY_LENGTH:
+        raise HTTPException(status_code=400, detail=f"Search query must be at most {MAX_QUERY_LENGTH} characters")
+    return {"$text": {"$search": q}}
+
+async def search_page(
+    collection: AsyncCollection,
+    q: str,
+    params: Optional[PageParams] = None,
+    projection: Optional[dict] = None,
+    query: Optional[dict] = None,
+) -> Page:
+    """One page of text-search matches, best match first.
+
+    Relevance scores are not stable keys, so unlike ``paginate`` the
+    cursor here carries an offset into the ranked result list.
+    """
+    params = params or PageParams()
+    offset = decode_offset_cursor(params.cursor)
+    filters = {**(query or {}), **text_query(q)}
+    projection = {**(projection or {}), "score": SCORE}
+
+    docs = await (
+        collection.find(filters, projection)
+        .sort([("score", SCORE), ("_id", 1)])
+        .skip(offset)
+        .limit(params.limit + 1)
+        .to_list()
+    )
+    next_cursor = None
+    if len(docs) > params.limit:
+        docs = docs[:params.limit]
+        next_cursor = encode_offset_cursor(offset + params.limit)
+    return Page(items=docs, next_cursor=next_cursor)
+
+def _summary(text: Optional[str]) -> Optional[str]:
+    if not text or len(text) <= SUMMARY_LENGTH:
+        return text
+    return text[:SUMMARY_LENGTH].rsplit(" ", 1)[0] + "…"
+
+async def search_all(db: AsyncDatabase, q: str, types: Optional[List[str]] = None, params: Optional[PageParams] = None) -> Page:
+    """Search every public collection and merge the hits by relevance"""
+    params = params or PageParams()
+    offset = decode_offset_cursor(params.cursor)
+    names = types or list(PUBLIC_SEARCH_TARGETS)
+    unknown = [name for name in names if name not in PUBLIC_SEARCH_TARGETS]
+    if unknown:
+        raise HTTPException(status_code=400, detail=f"Unknown search type(s): {', '.join(unknown)}")
+
+    # Each collection contributes at most offset + limit + 1 hits to the merged ranking
+    window = PageParams(limit=offset + params.limit + 1)
+    hits = []
+    for name in names:
+        target = PUBLIC_SEARCH_TARGETS[name]
+        projection = {target.title_field: 1, target.summary_field: 1}
+        query = {"is_active": {"$ne": False}} if name != "library" else None
+        page = await search_page(db[target.collection], q, window, projection, query)
+        for doc in page.items:
+            hits.append({
+                "type": name,
+                "id": str(doc["_id"]),
+                "title": doc.get(target.title_field),
+                "summary": _summary(doc.get(target.summary_field)),
+                "score": doc["score"],
+            })
+
+    hits.sort(key=lambda hit: (-hit["score"], hit["type"], hit["id"]))
+    items = hits[offset:offset + params.limit]
+    next_cursor = encode_offset_cursor(offset + params.limit) if len(hits) > offset + params.limit else None
+    return Page(items=items, next_cursor=next_cursor)
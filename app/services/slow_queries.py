@@ -0,0 +1,188 @@
+import asyncio
+import random
+import sys
+from contextvars import ContextVar
+from datetime import datetime
+from typing import Any, Dict, List, Optional, Tuple
+from pymongo import DESCENDING, monitoring
+from pymongo.asynchronous.database import AsyncDatabase
+from pymongo.errors import CollectionInvalid
+from app.config import settings
+from app.services.metrics import current_request, route_template
+from app.services.pagination import Page, PageParams, paginate
+
+SLOW_QUERY_COLLECTION = "slow_queries"
+EXPLAINABLE_COMMANDS = ("find", "aggregate")
+# Parts of a find/aggregate command that shape its plan; driver fields are dropped
+EXPLAIN_FIELDS = ("find", "aggregate", "filter", "sort", "projection", "hint", "skip", "limit", "collation", "pipeline")
+# Modules that make up the plumbing between a service and the driver
+INTERNAL_MODULES = ("app.services.slow_queries", "app.services.metrics", "app.services.pagination", "app.db.")
+
+# Set while the listener's own explain/insert run, so they are never logged themselves
+_recording: ContextVar[bool] = ContextVar("slow_query_recording", default=False)
+# Keep references so pending explains/inserts are not garbage collected mid-flight
+_pending_jobs = set()
+
+# Off until ensure_slow_query_log has made the capped collection; an insert
+# before then would create it as an ordinary, unbounded one
+_log_ready = False
+
+def redact(value: Any) -> Any:
+    """Keep the shape of a filter but drop its values, which may be personal data"""
+    if isinstance(value, dict):
+        return {key: redact(item) for key, item in value.items()}
+    if isinstance(value, list):
+        return [redact(item) for item in value]
+    return "?"
+
+def _command_filter(command: dict) -> Any:
+    for key in ("updates", "deletes"):
+        if command.get(key):
+            return command[key][0].get("q")
+    return command.get("filter") or command.get("query")
+
+def _caller() -> Optional[str]:
+    """The innermost app function (outside the data-access plumbing) on the stack"""
+    frame = sys._getframe(2)
+    while frame is not None:
+        module = frame.f_globals.get("__name__", "")
+        if module.startswith("app.") and not module.startswith(INTERNAL_MODULES):
+            return f"{module}.{frame.f_code.co_name}"
+        frame = frame.f_back
+    return None
+
+def _winning_plans(explain: Any) -> List[dict]:
+    if isinstance(explain, dict):
+        plans = [explain["winningPlan"]] if isinstance(explain.get("winningPlan"), dict) else []
+        for key, value in explain.items():
+            if key != "winningPlan":
+                plans.extend(_winning_plans(value))
+        return plans
+    if isinstance(explain, list):
+        return [plan for item in explain for plan in _winning_plans(item)]
+    return []
+
+def _plan_stages(plan: dict, stages: List[str], indexes: List[str]):
+    if plan.get("stage"):
+        stages.append(plan["stage"])
+    if plan.get("indexName"):
+        indexes.append(plan["indexName"])
+    for child in [plan.get("inputStage"), plan.get("queryPlan"), *plan.get("inputStages", [])]:
+        if isinstance(child, dict):
+            _plan_stages(child, stages, indexes)
+
+def plan_summary(explain: dict) -> Dict[str, Any]:
+    """Reduce explain output to the stages of the winning plan and the indexes it used"""
+    stages, indexes = [], []
+    for plan in _winning_plans(explain):
+        _plan_stages(plan, stages, indexes)
+    return {"stages": stages, "indexes": indexes, "collscan": "COLLSCAN" in stages}
+
+async def _explain(db: AsyncDatabase, command_name: str, command: dict) -> Dict[str, Any]:
+    target = {key: command[key] for key in EXPLAIN_FIELDS if key in command}
+    if command_name == "aggregate":
+        target["cursor"] = {}
+    # queryPlanner only plans the query; executionStats would run it a second time
+    explain = await db.command({"explain": target, "verbosity": "queryPlanner"})
+    return plan_summary(explain)
+
+async def _record(entry: dict, command: Optional[dict]):
+    from app.db.database import db as app_db
+
+    _recording.set(True)
+    if app_db is None or not _log_ready:
+        return
+    try:
+        if command is not None:
+            try:
+                entry["plan"] = await _explain(app_db.client[entry["database"]], entry["command"], command)
+            except Exception as e:
+                entry["plan"] = {"error": str(e)}
+        await app_db[SLOW_QUERY_COLLECTION].insert_one(entry)
+    except Exception as e:
+        print(f"Failed to record slow query: {e}")
+
+class SlowQueryListener(monitoring.CommandListener):
+    """Log commands slower than SLOW_QUERY_MS and keep them in a capped collection.
+
+    A sample of slow finds and aggregates is explained to record whether
+    the winning plan scanned the whole collection.
+    """
+
+    def __init__(self):
+        # Started commands by request id; the succeeded event does not carry the command
+        self._pending: Dict[Tuple[Any, int], Tuple[str, dict]] = {}
+
+    def started(self, event):
+        if _recording.get():
+            return
+        self._pending[(event.connection_id, event.request_id)] = (event.database_name, event.command)
+
+    def succeeded(self, event):
+        self._finished(event)
+
+    def failed(self, event):
+        self._finished(event, failure=str(event.failure))
+
+    def _finished(self, event, failure: Optional[str] = None):
+        started = self._pending.pop((event.connection_id, event.request_id), None)
+        duration_ms = event.duration_micros / 1000
+        if started is None or duration_ms < settings.SLOW_QUERY_MS:
+            return
+        database_name, command = started
+        scope = current_request.get()
+        entry = {
+            "created_at": datetime.utcnow(),
+            "database": database_name,
+            "command": event.command_name,
+            "collection": command.get(event.command_name) if isinstance(command.get(event.command_name), str) else None,
+            "duration_ms": round(duration_ms, 1),
+            "route": f"{scope['method']} {route_template(scope)}" if scope else None,
+            "caller": _caller(),
+            "filter": redact(_command_filter(command)),
+            "pipeline_stages": [next(iter(stage)) for stage in command.get("pipeline", []) if stage],
+            "failure": failure,
+        }
+        print(f"Slow query: {entry['command']} {entry['collection']} {entry['duration_ms']}ms route={entry['route']} caller={entry['caller']}")
+
+        explain = event.command_name in EXPLAINABLE_COMMANDS and random.random() < settings.SLOW_QUERY_EXPLAIN_SAMPLE_RATE
+        try:
+            task = asyncio.get_running_loop().create_task(_record(entry, command if explain else None))
+        except RuntimeError:
+            return
+        _pending_jobs.add(task)
+        task.add_done_callback(_pending_jobs.discard)
+
+slow_query_listener = SlowQueryListener()
+
+async def ensure_slow_query_log(db: AsyncDatabase):
+    """Create the capped slow-query collection, converting an uncapped one left by older versions"""
+    global _log_ready
+    try:
+        await db.create_collection(SLOW_QUERY_COLLECTION, capped=True, size=settings.SLOW_QUERY_LOG_BYTES)
+    except CollectionInvalid:
+        options = await db[SLOW_QUERY_COLLECTION].options()
+        if not options.get("capped"):
+            print(f"Converting {SLOW_QUERY_COLLECTION} to a capped collection")
+            await db.command({"convertToCapped": SLOW_QUERY_COLLECTION, "size": settings.SLOW_QUERY_LOG_BYTES})
+    _log_ready = True
+
+async def get_slow_queries(
+    db: AsyncDatabase,
+    params: Optional[PageParams] = None,
+    collection: Optional[str] = None,
+    route: Optional[str] = None,
+    collscan: Optional[bool] = None,
+) -> Page:
+    """Recorded slow commands, newest first"""
+    query = {}
+    if collection:
+        query["collection"] = collection
+    if route:
+        query["route"] = route
+    if collscan is not None:
+        query["plan.collscan"] = collscan
+    page = await paginate(db[SLOW_QUERY_COLLECTION], query, params, direction=DESCENDING)
+    for entry in page.items:
+        entry["id"] = str(entry.pop("_id"))
+    return page
@@ -1,68 +1,66 @@
-from pymongo.database import Database
-from app.schemas.student import StudentCreate, StudentUpdate
+from pymongo import ASCENDING
+from pymongo.asynchronous.cursor import AsyncCursor
+from pymongo.asynchronous.database import AsyncDatabase
+from app.schemas.student import Student, StudentCreate, StudentUpdate
 from bson import ObjectId
 from fastapi import UploadFile
-import shutil
-import os
-from typing import Optional
+from typing import List, Optional
 from app.config import settings
+from app.services.pagination import Page, PageParams, paginate
+from app.services.fields import projection_for
+from app.services.media_store import store_media, release_media
+from app.services.versioning import collection_changed
+from app.services.typeahead import student_typeahead
 
-MEDIA_DIR = "media"
-
-def save_upload_file(upload_file: UploadFile, destination: str) -> str:
-    try:
-        with open(destination, "wb") as buffer:
-            shutil.copyfileobj(upload_file.file, buffer)
-    finally:
-        upload_file.file.close()
-    return destination
-
-def get_all_students(db: Database):
-    students = list(db.students.find())
-    for student in students:
+async def get_all_students(db: AsyncDatabase, params: Optional[PageParams] = None, fields: Optional[List[str]] = None) -> Page:
+    page = await paginate(db.students, params=params, projection=projection_for(Student, fields))
+    for student in page.items:
         student["id"] = str(student["_id"])
         if student.get("profile_image_url"):
             student["profile_image_url"] = f"{settings.MEDIA_URL}{student['profile_image_url']}"
-    return students
+    return page
 
-def create_new_student(db: Database, student: StudentCreate, profile_image: Optional[UploadFile] = None):
+async def create_new_student(db: AsyncDatabase, student: StudentCreate, profile_image: Optional[UploadFile] = None):
     student_dict = student.dict()
     
     if profile_image:
-        filename = profile_image.filename
-        file_location = os.path.join(MEDIA_DIR, filename)
-        save_upload_file(profile_image, file_location)
-        student_dict["profile_image_url"] = f"/media/{filename}"
+        student_dict["profile_image_url"] = await store_media(db, profile_image, "image")
 
-    result = db.students.insert_one(student_dict)
+    result = await db.students.insert_one(student_dict)
+    student_typeahead.written(await collection_changed(db, "students"), str(result.inserted_id), student_dict)
     return str(result.inserted_id)
 
-def update_student_by_id(db: Database, student_id: str, student: StudentUpdate, profile_image: Optional[UploadFile] = None):
+async def update_student_by_id(db: AsyncDatabase, student_id: str, student: StudentUpdate, profile_image: Optional[UploadFile] = None):
     student_dict = student.dict(exclude_unset=True)
 
     if profile_image:
-        old_student = db.students.find_one({"_id": ObjectId(student_id)})
-        if old_student and old_student.get("profile_image_url"):
-            old_image_path = old_student["profile_image_url"].replace("/media/", f"{MEDIA_DIR}/", 1)
-            if os.path.exists(old_image_path):
-                os.remove(old_image_path)
-
-        filename = profile_image.filename
-        file_location = os.path.join(MEDIA_DIR, filename)
-        save_upload_file(profile_image, file_location)
-        student_dict["profile_image_url"] = f"/media/{filename}"
+        # A missing student would leave the new image's blob referenced by nothing
+        old_student = await db.students.find_one({"_id": ObjectId(student_id)})
+        if not old_student:
+            return False
+        student_dict["profile_image_url"] = await store_media(db, profile_image, "image")
+        await release_media(db, old_student.get("profile_image_url"))
     
-    result = db.students.update_one(
+    result = await db.students.update_one(
         {"_id": ObjectId(student_id)}, {"$set": student_dict}
     )
+    version = await collection_changed(db, "students")
+    student_typeahead.written(version, student_id, await db.students.find_one({"_id": ObjectId(student_id)}))
     return result.modified_count > 0
 
-def delete_student_by_id(db: Database, student_id: str):
-    student = db.students.find_one({"_id": ObjectId(student_id)})
-    if student and student.get("profile_image_url"):
-        image_path = student["profile_image_url"].replace("/media/", f"{MEDIA_DIR}/", 1)
-        if os.path.exists(image_path):
-            os.remove(image_path)
+async def delete_student_by_id(db: AsyncDatabase, student_id: str):
+    student = await db.students.find_one({"_id": ObjectId(student_id)})
+    if student:
+        await release_media(db, student.get("profile_image_url"))
             
-    result = db.students.delete_one({"_id": ObjectId(student_id)})
-    return result.deleted_count > 0 
\ No newline at end of file
+    result = await db.students.delete_one({"_id": ObjectId(student_id)})
+    student_typeahead.written(await collection_changed(db, "students"), student_id, None)
+    return result.deleted_count > 0
+
+STUDENT_EXPORT_FIELDS = ["_id", "name", "class_name", "parent_name", "contact_number", "joined_date"]
+
+def export_students(db: AsyncDatabase, class_name: Optional[str] = None) -> AsyncCursor:
+    """Cursor over the student roster to export, projected to the exported fields"""
+    query = {"class_name": class_name} if class_name else {}
+    projection = {field: 1 for field in STUDENT_EXPORT_FIELDS}
+    return db.students.find(query, projection).sort("_id", ASCENDING)
@@ -0,0 +1,210 @@
+import asyncio
+import re
+import unicodedata
+from bisect import bisect_left, insort
+from typing import Dict, Iterator, List, Optional, Set, Tuple
+from pymongo.asynchronous.database import AsyncDatabase
+from app.config import settings
+
+MAX_SUGGESTIONS = 20
+_WORD = re.compile(r"\w+")
+
+def normalize(text: str) -> str:
+    """Casefold and strip accents so 'Zoë' matches 'zoe'"""
+    decomposed = unicodedata.normalize("NFKD", text.casefold())
+    return "".join(ch for ch in decomposed if not unicodedata.combining(ch))
+
+def tokenize(text: str) -> List[str]:
+    return _WORD.findall(normalize(text))
+
+def trigrams(token: str) -> Set[str]:
+    return {token[i:i + 3] for i in range(len(token) - 2)}
+
+class TypeaheadIndex:
+    """In-process prefix/trigram index over a few text fields of one collection.
+
+    Each word of the indexed fields goes into a sorted token list, so a
+    query term is a prefix range found by bisection; terms of three or more
+    characters that prefix nothing fall back to trigram postings to match
+    inside words. Every query term must match for a document to be
+    suggested. The whole index is rebuilt from Mongo at startup and
+    whenever ``version`` falls behind the collection's write version;
+    writes made by this process are applied incrementally.
+    """
+
+    def __init__(self, namespace: str, collection: str, fields: Tuple[str, ...], display: Tuple[str, ...]):
+        self.namespace = namespace
+        self.collection = collection
+        self.fields = fields
+        self.display = display
+        self.version: Optional[int] = None
+        # Serializes rebuilds so concurrent callers wait for one load instead of each starting their own
+        self.load_lock = asyncio.Lock()
+        self._docs: Dict[str, dict] = {}
+        self._doc_tokens: Dict[str, Set[str]] = {}
+        self._sorted: List[Tuple[str, str]] = []
+        self._trigrams: Dict[str, Set[str]] = {}
+
+    def __len__(self) -> int:
+        return len(self._docs)
+
+    def _tokens_for(self, doc: dict) -> Set[str]:
+        tokens = set()
+        for field in self.fields:
+            if doc.get(field):
+                tokens.update(tokenize(str(doc[field])))
+        return tokens
+
+    def add(self, doc_id: str, doc: dict):
+        """Insert or replace one document"""
+        self.remove(doc_id)
+        tokens = self._tokens_for(doc)
+        self._docs[doc_id] = {"id": doc_id, **{field: doc.get(field) for field in self.display}}
+        self._doc_tokens[doc_id] = tokens
+        for token in tokens:
+            insort(self._sorted, (token, doc_id))
+            for gram in trigrams(token):
+                self._trigrams.setdefault(gram, set()).add(doc_id)
+
+    def remove(self, doc_id: str):
+        tokens = self._doc_tokens.pop(doc_id, None)
+        if tokens is None:
+            return
+        del self._docs[doc_id]
+        for token in tokens:
+            i = bisect_left(self._sorted, (token, doc_id))
+            if i < len(self._sorted) and self._sorted[i] == (token, doc_id):
+                del self._sorted[i]
+            for gram in trigrams(token):
+                postings = self._trigrams.get(gram)
+                if postings is not None:
+                    postings.discard(doc_id)
+                    if not postings:
+                        del self._trigrams[gram]
+
+    def _prefix_range(self, term: str) -> Iterator[str]:
+        """Ids whose tokens start with ``term``, exact and shorter tokens first"""
+        i = bisect_left(self._sorted, (term, ""))
+        while i < len(self._sorted) and self._sorted[i][0].startswith(term):
+            yield self._sorted[i][1]
+            i += 1
+
+    def _infix_matches(self, term: str) -> List[str]:
+        grams = trigrams(term)
+        if not grams:
+            return []
+        candidates = set.intersection(*(self._trigrams.get(gram, set()) for gram in grams))
+        matches = [doc_id for doc_id in candidates if any(term in token for token in self._doc_tokens[doc_id])]
+        return sorted(matches, key=lambda doc_id: normalize(str(self._docs[doc_id].get(self.display[0]) or "")))
+
+    def _matches(self, doc_id: str, term: str) -> bool:
+        infix = len(term) >= 3
+        return any(token.startswith(term) or (infix and term in token) for token in self._doc_tokens[doc_id])
+
+    def suggest(self, q: str, limit: int = 10) -> List[dict]:
+        """Documents matching every term of ``q``.
+
+        Candidates come from walking the sorted range of the first term, so
+        the scan stops as soon as ``limit`` matches are found.
+        """
+        terms = tokenize(q)
+        if not terms:
+            return []
+        lead, rest = terms[0], terms[1:]
+        candidates = self._prefix_range(lead)
+        if len(lead) >= 3 and next(self._prefix_range(lead), None) is None:
+            candidates = iter(self._infix_matches(lead))
+
+        results, seen = [], set()
+        for doc_id in candidates:
+            if doc_id in seen:
+                continue
+            seen.add(doc_id)
+            if all(self._matches(doc_id, term) for term in rest):
+                results.append(self._docs[doc_id])
+                if len(results) >= limit:
+                    break
+        return results
+
+    async def load(self, db: AsyncDatabase):
+        """Rebuild the whole index from the collection"""
+        from app.services.versioning import get_collection_version
+
+        version = (await get_collection_version(db, self.namespace))["version"]
+        projection = {field: 1 for field in set(self.fields) | set(self.display)}
+        docs = await db[self.collection].find({}, projection).to_list()
+
+        doc_map, doc_tokens, entries, grams = {}, {}, [], {}
+        for doc in docs:
+            doc_id = str(doc["_id"])
+            tokens = self._tokens_for(doc)
+            doc_map[doc_id] = {"id": doc_id, **{field: doc.get(field) for field in self.display}}
+            doc_tokens[doc_id] = tokens
+            for token in tokens:
+                entries.append((token, doc_id))
+                for gram in trigrams(token):
+                    grams.setdefault(gram, set()).add(doc_id)
+        entries.sort()
+        self._docs, self._doc_tokens, self._sorted, self._trigrams = doc_map, doc_tokens, entries, grams
+        self.version = version
+
+    def written(self, version: int, doc_id: str, doc: Optional[dict]):
+        """Apply a write made by this process (``doc`` None means deleted).
+
+        If another worker wrote in between, the index is left stale so the
+        refresher rebuilds it instead of missing that write.
+        """
+        if self.version is None or version != self.version + 1:
+            self.version = None
+            return
+        if doc is None:
+            self.remove(doc_id)
+        else:
+            self.add(doc_id, doc)
+        self.version = version
+
+student_typeahead = TypeaheadIndex(
+    "students", "students",
+    fields=("name", "parent_name"),
+    display=("name", "class_name", "parent_name"),
+)
+faculty_typeahead = TypeaheadIndex(
+    "faculties", "faculties",
+    fields=("name", "subject"),
+    display=("name", "subject", "qualification"),
+)
+TYPEAHEAD_INDEXES = (student_typeahead, faculty_typeahead)
+
+def mark_stale(namespace: str):
+    """Force a rebuild on next use, after writes that bypass ``written`` (e.g. bulk imports)"""
+    for index in TYPEAHEAD_INDEXES:
+        if index.namespace == namespace:
+            index.version = None
+
+async def suggest(db: AsyncDatabase, index: TypeaheadIndex, q: str, limit: int = 10) -> List[dict]:
+    """Answer from memory, rebuilding first only if the index was marked stale"""
+    if index.version is None:
+        async with index.load_lock:
+            if index.version is None:
+                await index.load(db)
+    return index.suggest(q, limit)
+
+async def refresh_typeahead_indexes(db: AsyncDatabase):
+    """Rebuild any index whose collection was written since it was built"""
+    from app.services.versioning import get_collection_version
+
+    for index in TYPEAHEAD_INDEXES:
+        version = (await get_collection_version(db, index.namespace))["version"]
+        if index.version != version:
+            async with index.load_lock:
+                if index.version != version:
+                    await index.load(db)
+
+async def run_typeahead_refresher(db: AsyncDatabase):
+    """Build the indexes, then keep them in step with writes from other workers"""
+    while True:
+        try:
+            await refresh_typeahead_indexes(db)
+        except Exception as e:
+            print(f"Typeahead refresh failed: {e}")
+        await asyncio.sleep(settings.TYPEAHEAD_REFRESH_SECONDS)
@@ -0,0 +1,145 @@
+import hashlib
+import os
+import tempfile
+from dataclasses import dataclass
+from typing import Dict, Optional
+from fastapi import HTTPException, UploadFile
+from fastapi.responses import JSONResponse
+from starlette.concurrency import run_in_threadpool
+from app.config import settings
+
+CHUNK_SIZE = 1024 * 1024
+
+UPLOAD_LIMITS: Dict[str, int] = {
+    "image": settings.MAX_IMAGE_UPLOAD_BYTES,
+    "video": settings.MAX_VIDEO_UPLOAD_BYTES,
+    "document": settings.MAX_DOCUMENT_UPLOAD_BYTES,
+    "import": settings.MAX_IMPORT_UPLOAD_BYTES,
+}
+
+# Slack for multipart boundaries and the non-file form fields
+MULTIPART_OVERHEAD = 1024 * 1024
+
+# Largest request body accepted per upload route prefix; the longest
+# matching prefix wins. Event forms may carry an image and a video
+# together, bulk imports a data file plus a zip of images.
+REQUEST_BODY_LIMITS: Dict[str, int] = {
+    "/students/import": UPLOAD_LIMITS["import"] + MULTIPART_OVERHEAD,
+    "/admin/faculties/import": UPLOAD_LIMITS["import"] + MULTIPART_OVERHEAD,
+    "/courses/import": UPLOAD_LIMITS["import"] + MULTIPART_OVERHEAD,
+    "/classes/import": UPLOAD_LIMITS["import"] + MULTIPART_OVERHEAD,
+    "/events": UPLOAD_LIMITS["video"] + UPLOAD_LIMITS["image"] + MULTIPART_OVERHEAD,
+    "/library": UPLOAD_LIMITS["document"] + MULTIPART_OVERHEAD,
+    "/gallery": UPLOAD_LIMITS["image"] + MULTIPART_OVERHEAD,
+    "/students": UPLOAD_LIMITS["image"] + MULTIPART_OVERHEAD,
+    "/admin/faculties": UPLOAD_LIMITS["image"] + MULTIPART_OVERHEAD,
+}
+
+@dataclass
+class StoredUpload:
+    path: str
+    size: int
+    sha256: str
+    content_type: Optional[str]
+    original_filename: str
+
+def _too_large(kind: str) -> HTTPException:
+    limit_mb = UPLOAD_LIMITS[kind] / (1024 * 1024)
+    return HTTPException(status_code=413, detail=f"{kind.capitalize()} must be smaller than {limit_mb:g}MB")
+
+def _write_chunk(buffer, digest, chunk: bytes):
+    digest.update(chunk)
+    buffer.write(chunk)
+
+def remove_file(path: str):
+    """Delete a file if it is still there (blocking)"""
+    try:
+        os.remove(path)
+    except FileNotFoundError:
+        pass
+
+async def save_upload(upload_file: UploadFile, destination: str, kind: str) -> StoredUpload:
+    """Stream an upload to ``destination`` without blocking the event loop.
+
+    The file is copied in chunks into a temp file next to the destination,
+    hashing as it goes and aborting with 413 as soon as the per-kind limit
+    is crossed. Only a complete file is renamed into place, so readers
+    never see a partial upload.
+    """
+    limit = UPLOAD_LIMITS[kind]
+    directory = os.path.dirname(destination) or "."
+    await run_in_threadpool(os.makedirs, directory, exist_ok=True)
+    fd, tmp_path = await run_in_threadpool(tempfile.mkstemp, dir=directory, prefix=".upload-")
+
+    digest = hashlib.sha256()
+    size = 0
+    try:
+        with os.fdopen(fd, "wb") as buffer:
+            while chunk := await upload_file.read(CHUNK_SIZE):
+                size += len(chunk)
+                if size > limit:
+                    raise _too_large(kind)
+                await run_in_threadpool(_write_chunk, buffer, digest, chunk)
+        await run_in_threadpool(os.replace, tmp_path, destination)
+    except BaseException:
+        await run_in_threadpool(remove_file, tmp_path)
+        raise
+    finally:
+        await upload_file.close()
+
+    return StoredUpload(
+        path=destination,
+        size=size,
+        sha256=digest.hexdigest(),
+        content_type=upload_file.content_type,
+        original_filename=upload_file.filename,
+    )
+
+class RequestBodyTooLarge(HTTPException):
+    def __init__(self):
+        super().__init__(status_code=413, detail="Request body too large")
+
+class UploadLimitMiddleware:
+    """Reject oversized upload requests while the body is still arriving.
+
+    A declared Content-Length over the route's limit is refused before any
+    byte is read; otherwise the received bytes are counted and the request
+    is aborted the moment they cross the limit, instead of after the whole
+    body has been spooled to disk.
+    """
+
+    def __init__(self, app, limits: Dict[str, int] = REQUEST_BODY_LIMITS):
+        self.app = app
+        self.limits = limits
+
+    def _limit_for(self, path: str) -> Optional[int]:
+        matches = [prefix for prefix in self.limits if path.startswith(prefix)]
+        if not matches:
+            return None
+        return self.limits[max(matches, key=len)]
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http" or scope["method"] not in ("POST", "PUT"):
+            return await self.app(scope, receive, send)
+        limit = self._limit_for(scope["path"])
+        if limit is None:
+            return await self.app(scope, receive, send)
+
+        headers = dict(scope["headers"])
+        content_length = headers.get(b"content-length")
+        if content_length is not None and content_length.isdigit() and int(content_length) > limit:
+            response = JSONResponse({"detail": "Request body too large"}, status_code=413)
+            return await response(scope, receive, send)
+
+        received = 0
+
+        async def limited_receive():
+            nonlocal received
+            message = await receive()
+            if message["type"] == "http.request":
+                received += len(message.get("body", b""))
+                if received > limit:
+                    raise RequestBodyTooLarge()
+            return message
+
+        await self.app(scope, limited_receive, send)
@@ -1,40 +1,54 @@
-from pymongo.database import Database
-from app.schemas.user import UserCreate, UserUpdate
+from typing import List, Optional
+from pymongo.asynchronous.database import AsyncDatabase
+from app.schemas.user import User, UserCreate, UserUpdate
+from app.services.pagination import Page, PageParams, paginate
+from app.services.fields import projection_for
 from bson import ObjectId
 
-def get_user_by_email(db: Database, email: str):
-    return db.users.find_one({"email": email})
+async def get_user_by_email(db: AsyncDatabase, email: str):
+    return await db.users.find_one({"email": email})
 
-def get_all_users(db: Database):
-    users = list(db.users.find())
-    for user in users:
+async def get_all_users(db: AsyncDatabase, params: Optional[PageParams] = None, fields: Optional[List[str]] = None) -> Page:
+    page = await paginate(db.users, params=params, projection=projection_for(User, fields))
+    for user in page.items:
         user["id"] = str(user["_id"])
-    return users
+    return page
 
-def create_new_user(db: Database, user: UserCreate):
+async def create_new_user(db: AsyncDatabase, user: UserCreate):
     from app.services.auth import get_password_hash
-    hashed_password = get_password_hash(user.password)
+    hashed_password = await get_password_hash(user.password)
     user_dict = user.dict()
     user_dict["hashed_password"] = hashed_password
     del user_dict["password"]
     
-    result = db.users.insert_one(user_dict)
+    result = await db.users.insert_one(user_dict)
     return str(result.inserted_id)
 
-def update_user_by_id(db: Database, user_id: str, user: UserUpdate):
+async def update_user_by_id(db: AsyncDatabase, user_id: str, user: UserUpdate):
     update_data = user.dict(exclude_unset=True)
     
-    result = db.users.update_one(
+    old_user = await db.users.find_one({"_id": ObjectId(user_id)}, {"email": 1})
+    result = await db.users.update_one(
         {"_id": ObjectId(user_id)}, {"$set": update_data}
     )
+    if old_user:
+        await forget_principal(old_user["email"])
     return result.modified_count > 0
 
-def delete_user_by_id(db: Database, user_id: str):
-    result = db.users.delete_one({"_id": ObjectId(user_id)})
+async def delete_user_by_id(db: AsyncDatabase, user_id: str):
+    user = await db.users.find_one({"_id": ObjectId(user_id)}, {"email": 1})
+    result = await db.users.delete_one({"_id": ObjectId(user_id)})
+    if user:
+        await forget_principal(user["email"])
     return result.deleted_count > 0
 
-def create_default_admin(db: Database):
-    if not get_user_by_email(db, "admin@jnanituition.com"):
+async def forget_principal(email: str):
+    """Drop every cached login of this user so the next request re-reads it"""
+    from app.services.auth import principal_cache
+    await principal_cache.invalidate(email)
+
+async def create_default_admin(db: AsyncDatabase):
+    if not await get_user_by_email(db, "admin@jnanituition.com"):
         admin_user = UserCreate(
             name="Admin",
             email="admin@jnanituition.com",
@@ -42,12 +56,12 @@ def create_default_admin(db: Database):
             is_active=True,
             roles=["admin"] # Assign a default 'admin' role
         )
-        create_new_user(db, admin_user)
+        await create_new_user(db, admin_user)
         print("Default admin user created.")
         
         # Also create a default admin role if it doesn't exist
-        if not db.roles.find_one({"name": "admin"}):
-            db.roles.insert_one({
+        if not await db.roles.find_one({"name": "admin"}):
+            await db.roles.insert_one({
                 "name": "admin",
                 "description": "Administrator with all permissions",
                 "permissions": ["*"] # Wildcard for all permissions
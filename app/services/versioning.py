@@ -0,0 +1,83 @@
+from datetime import datetime, timezone
+from email.utils import format_datetime, parsedate_to_datetime
+from typing import Dict, Iterable
+from fastapi import Request
+from pymongo import ReturnDocument
+from pymongo.asynchronous.database import AsyncDatabase
+from app.services.cache import response_cache
+
+# Namespaces the /public/home bundle is built from
+HOME_NAMESPACE = "home"
+HOME_NAMESPACES = ("content", "events", "courses", "gallery")
+
+async def get_versions(db: AsyncDatabase, namespaces: Iterable[str]) -> Dict[str, dict]:
+    """Version documents for several namespaces in one read (version 0 if never written)"""
+    namespaces = list(namespaces)
+    docs = await db.collection_versions.find({"_id": {"$in": namespaces}}).to_list()
+    versions = {namespace: {"_id": namespace, "version": 0, "updated_at": None} for namespace in namespaces}
+    versions.update({doc["_id"]: doc for doc in docs})
+    return versions
+
+async def get_collection_version(db: AsyncDatabase, namespace: str) -> dict:
+    """Get the current write version of a namespace (0 if never written).
+
+    The home bundle's version is composed from its sources' versions, so
+    its validators change with the first write to any of them, whether or
+    not the materialized bundle has been rebuilt yet.
+    """
+    if namespace == HOME_NAMESPACE:
+        sources = (await get_versions(db, HOME_NAMESPACES)).values()
+        return {
+            "_id": namespace,
+            "version": ".".join(str(doc["version"]) for doc in sources),
+            "updated_at": max((doc["updated_at"] for doc in sources if doc.get("updated_at")), default=None),
+        }
+    doc = await db.collection_versions.find_one({"_id": namespace})
+    return doc or {"_id": namespace, "version": 0, "updated_at": None}
+
+async def collection_changed(db: AsyncDatabase, namespace: str) -> int:
+    """Record a write: bump the namespace version, drop its cached responses and return the new version"""
+    doc = await db.collection_versions.find_one_and_update(
+        {"_id": namespace},
+        {"$inc": {"version": 1}, "$set": {"updated_at": datetime.utcnow()}},
+        upsert=True,
+        return_document=ReturnDocument.AFTER
+    )
+    await response_cache.invalidate(namespace)
+    if namespace in HOME_NAMESPACES:
+        from app.services.home_service import schedule_home_refresh
+        await response_cache.invalidate(HOME_NAMESPACE)
+        schedule_home_refresh(db)
+    return doc["version"]
+
+def validator_headers(version_doc: dict) -> Dict[str, str]:
+    """Build ETag / Last-Modified headers for a namespace version"""
+    headers = {
+        "ETag": f'W/"{version_doc["_id"]}-{version_doc["version"]}"',
+        "Cache-Control": "no-cache",
+    }
+    if version_doc.get("updated_at"):
+        updated_at = version_doc["updated_at"].replace(tzinfo=timezone.utc, microsecond=0)
+        headers["Last-Modified"] = format_datetime(updated_at, usegmt=True)
+    return headers
+
+def is_not_modified(request: Request, headers: Dict[str, str]) -> bool:
+    """Evaluate If-None-Match (preferred) or If-Modified-Since against our validators"""
+    if_none_match = request.headers.get("if-none-match")
+    if if_none_match is not None:
+        if if_none_match.strip() == "*":
+            return True
+        # Weak comparison: ignore the W/ prefix on either side
+        etag = headers["ETag"].removeprefix("W/")
+        return any(tag.strip().removeprefix("W/") == etag for tag in if_none_match.split(","))
+
+    if_modified_since = request.headers.get("if-modified-since")
+    if if_modified_since and "Last-Modified" in headers:
+        try:
+            since = parsedate_to_datetime(if_modified_since)
+        except (TypeError, ValueError):
+            return False
+        if since.tzinfo is None:
+            since = since.replace(tzinfo=timezone.utc)
+        return parsedate_to_datetime(headers["Last-Modified"]) <= since
+    return False